@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The modules are top-level scripts that read their data relative to the repo root.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
@@ -0,0 +1,50 @@
+import os
+import shutil
+
+import pandas as pd
+
+from torino_data import AER_CSV, CO_CSV, POPULATION_CSV, SOCIO_CSV, VEHICLE_CSV
+from torino_engine import DataEngine
+from torino_ingest import Store
+
+
+def _runs(engine):
+    return {name: s["runs"] for name, s in engine.graph.stats.items()}
+
+
+def _use(engine):
+    engine.merged("NO2")
+    engine.correlations()
+    engine.trend("CO")
+
+
+def test_only_downstream_nodes_recompute(tmp_path):
+    for name in (VEHICLE_CSV, SOCIO_CSV, POPULATION_CSV, CO_CSV, AER_CSV):
+        shutil.copy(name, tmp_path)
+    engine = DataEngine(data_path=str(tmp_path), store=Store(str(tmp_path / "store")))
+    _use(engine)
+    before = _runs(engine)
+
+    # A touched file with the same content changes no key.
+    vehicle = tmp_path / VEHICLE_CSV
+    os.utime(vehicle)
+    _use(engine)
+    assert _runs(engine) == before
+
+    df = pd.read_csv(vehicle)
+    df.loc[0, "vehicle_per_1000"] += 1
+    df.to_csv(vehicle, index=False)
+    _use(engine)
+    after = _runs(engine)
+    rerun = {name for name in after if after[name] != before[name]}
+    assert rerun == {"vehicle_csv", "vehicle", "merged", "scored", "correlations"}
+    assert all(after[name] - before[name] == 1 for name in rerun)
+
+
+def test_report_and_runs_snapshot(tmp_path):
+    engine = DataEngine(store=Store(str(tmp_path / "store")))
+    engine.zonal("NO2")
+    report = engine.graph.report().set_index("node")
+    assert report.loc["zonal", "runs"] == 1
+    assert report.loc["zonal", "memoised"] == 1
+    assert "zonal" in set(engine.graph.runs()["node"])
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+import torino_hotspots
+from torino_data import Raster, mask_fill
+from torino_engine import DataEngine
+from torino_hotspots import grid_weights, local_statistics
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return DataEngine()
+
+
+def test_mask_fill_only_without_declared_nodata():
+    arr = np.array([[0, 0, 1.5], [0, 2.0, 3.0]], dtype="float32")
+    masked = mask_fill(Raster("x.tif", arr, None, None, None, None))
+    assert np.isnan(masked.arr).sum() == 3
+    assert np.isnan(arr).sum() == 0
+    declared = Raster("x.tif", arr, None, None, None, -999.0)
+    assert mask_fill(declared) is declared
+
+
+def test_fill_is_not_a_cluster():
+    # A smooth footprint in a sea of zero fill: with the fill masked, the
+    # footprint's edge must not come out as one big hot spot.
+    rng = np.random.default_rng(1)
+    arr = np.zeros((30, 30), dtype="float32")
+    arr[10:20, 10:20] = rng.normal(5, 1, (10, 10))
+    masked = mask_fill(Raster("x.tif", arr, None, None, None, None)).arr
+    valid = np.isfinite(masked)
+    stats = local_statistics(masked[valid], grid_weights(valid), permutations=199)
+    assert len(stats) == 100
+    assert (stats["hotspot"] == "Hot spot").sum() < 20
+
+
+@pytest.mark.parametrize("pollutant", ["NO2", "SO2"])
+def test_municipalities_without_data_are_left_out(engine, pollutant):
+    spots = engine.hotspots(pollutant)
+    significant = spots["hotspot"] != "Not significant"
+    assert (spots["value"] != 0).all()
+    assert spots.loc[significant, "value"].notna().all()
+    assert spots["value"].isna().any()
+    # The fill used to make every covered municipality HH and every empty one LL.
+    assert 0 < significant.sum() < spots["value"].notna().sum() / 2
+
+
+@pytest.mark.parametrize("pollutant", ["NO2", "SO2"])
+def test_pixels_outside_the_footprint_are_left_out(engine, pollutant):
+    pixels = engine.hotspots(pollutant, level="pixel")
+    arr = engine.raster(pollutant).arr
+    footprint = np.isfinite(arr) & (arr != 0)
+    assert len(pixels) == footprint.sum()
+    assert footprint[pixels["row"], pixels["col"]].all()
+    hot = (pixels["hotspot"] == "Hot spot").sum()
+    assert 0 < hot < len(pixels) / 2
+
+
+def test_matches_esda(engine):
+    esda = pytest.importorskip("esda")
+    libpysal = pytest.importorskip("libpysal")
+    spots = engine.hotspots("NO2")
+    valid = spots["value"].notna().to_numpy()
+    ours = spots[valid]
+    w = sparse.csr_matrix(engine.graph.get("contiguity"))[valid][:, valid]
+    assert (np.asarray(w.sum(axis=1)).ravel() > 0).all()
+    y = ours["value"].to_numpy(dtype=float)
+
+    weights = libpysal.weights.WSP(w).to_W(silence_warnings=True)
+    moran = esda.Moran_Local(y, weights, transformation="r", permutations=999, seed=0)
+    np.testing.assert_allclose(ours["moran_i"], moran.Is, rtol=1e-10, atol=1e-12)
+    gi = esda.G_Local(y, weights, transform="B", star=True, permutations=0)
+    np.testing.assert_allclose(ours["gi_z"], gi.Zs, rtol=1e-10, atol=1e-12)
+    # Permutation p-values differ only by Monte Carlo noise.
+    assert np.corrcoef(ours["p_value"], moran.p_sim)[0, 1] > 0.95
+
+
+def test_process_pool_matches_inline(monkeypatch):
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=(12, 12))
+    weights = grid_weights(np.ones(values.shape, dtype=bool))
+    inline = local_statistics(values.ravel(), weights, permutations=99, batch_size=50, workers=2)
+    monkeypatch.setattr(torino_hotspots, "PARALLEL_MIN_WORK", 0)
+    pooled = local_statistics(values.ravel(), weights, permutations=99, batch_size=50, workers=2)
+    assert pooled.equals(inline)
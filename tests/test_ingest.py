@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import rasterio
+from rasterio.warp import Resampling, calculate_default_transform, reproject
+
+from torino_data import CO_CSV, DATA_DIR, read_raster, read_regions, read_sentinel_csv
+from torino_ingest import Ingestor, Store, read_trend_store
+from torino_pipeline import zonal_means
+
+RASTER = f"{DATA_DIR}/so2_turin_clipped.tif"
+
+
+def _to_utm(src_path, dst_path):
+    with rasterio.open(src_path) as src:
+        transform, width, height = calculate_default_transform(src.crs, "EPSG:32632", src.width, src.height, *src.bounds)
+        profile = src.profile | {"crs": "EPSG:32632", "transform": transform, "width": width, "height": height}
+        with rasterio.open(dst_path, "w", **profile) as dst:
+            reproject(rasterio.band(src, 1), rasterio.band(dst, 1), resampling=Resampling.nearest)
+            dst.set_band_description(1, src.descriptions[0] or "")
+
+
+def test_projected_raster_gets_zonal_means(tmp_path):
+    data, csv = tmp_path / "data", tmp_path / "csv"
+    data.mkdir(), csv.mkdir()
+    _to_utm(RASTER, data / "so2_utm.tif")
+
+    done = Ingestor(str(data), str(csv), Store(str(tmp_path / "store")), settle=0, bundled_dir=str(csv)).run_once()
+    (record,) = done.values()
+    assert record["status"] == "ok", record["reason"]
+
+    stored = pd.read_parquet(record["part"])["mean"].to_numpy(dtype=float)
+    original = zonal_means(read_regions(), read_raster(RASTER))["mean"].to_numpy(dtype=float)
+    assert np.isfinite(stored).sum() == np.isfinite(original).sum() > 0
+    both = np.isfinite(stored) & np.isfinite(original)
+    assert np.corrcoef(stored[both], original[both])[0, 1] > 0.95
+
+
+def test_new_export_extends_bundled_trend(tmp_path):
+    data, csv = tmp_path / "data", tmp_path / "csv"
+    data.mkdir(), csv.mkdir()
+    # A later export overlapping the bundled one's last month, with revised values.
+    raw = pd.read_csv(CO_CSV).tail(30)
+    later = raw.assign(**{"C0/date": (pd.to_datetime(raw["C0/date"]) + pd.Timedelta(days=15)).dt.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                          "C0/mean": raw["C0/mean"] * 2})
+    later.to_csv(csv / "Sentinel-5P CO-CO_VISUALIZED-later.csv", index=False)
+
+    store = Store(str(tmp_path / "store"))
+    done = Ingestor(str(data), str(csv), store, settle=0).run_once()
+    assert {r["status"] for r in done.values()} == {"ok"}
+
+    bundled = read_sentinel_csv(CO_CSV, "CO_Level")
+    merged = read_trend_store(store.trend_index("CO"), "CO")
+    assert merged["Date"].min() == bundled["Date"].min()
+    assert merged["Date"].max() == bundled["Date"].max() + pd.Timedelta(days=15)
+    new_dates = pd.to_datetime(later["C0/date"])
+    assert merged["Date"].is_unique and len(merged) == len(set(bundled["Date"]) | set(new_dates))
+    expected = pd.Series(later["C0/mean"].to_numpy(dtype="float32"), index=new_dates)
+    expected = expected[~expected.index.duplicated(keep="last")]
+    revised = merged.set_index("Date")["CO_Level"].loc[expected.index]
+    assert np.allclose(revised.to_numpy(), expected.to_numpy())
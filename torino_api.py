@@ -0,0 +1,236 @@
+"""Local JSON query API over the dashboard pipeline.
+
+Run next to the Streamlit app with ``python torino_api.py --port 8502``.
+
+    GET /zonal?pollutant=NO2
+    GET /trend?product=CO&from=2021-01-01&to=2022-12-31&resample=M
+    GET /sdg-score?pollutant=NO2
+    GET /zonal-history?pollutant=NO2
+
+Municipalities are identified by ``name`` (as displayed) and ``key`` (the
+lowercased join key used by the socio-economic tables) in every response.
+
+Responses are JSON records by default, or an Arrow IPC stream with
+``format=arrow`` / ``Accept: application/vnd.apache.arrow.stream``. Each
+distinct response is built once and then served from memory with a strong
+ETag (``If-None-Match`` gets a 304) and a pre-compressed gzip body. The
+CACHE_SIZE most recently used responses are kept, and the cache is dropped
+when the ingestion daemon (torino_ingest.py) adds data.
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from torino_engine import get_engine
+from torino_pipeline import TREND_PRODUCTS
+
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+# Most responses kept in memory; the least recently used is evicted first.
+CACHE_SIZE = 256
+
+
+class QueryError(Exception):
+    status = 400
+
+
+class NotAcceptable(QueryError):
+    status = 406
+
+
+# ── Pipeline ───────────────────────────────────────────────────────────────
+def _pollutant(params):
+    pollutant = _param(params, "pollutant", "NO2")
+    pollutants = get_engine().pollutants
+    if pollutant not in pollutants:
+        raise QueryError(f"unknown pollutant {pollutant!r}; expected one of {pollutants}")
+    return pollutant
+
+
+def _product(params):
+    product = _param(params, "product", "CO")
+    if product not in TREND_PRODUCTS:
+        raise QueryError(f"unknown product {product!r}; expected one of {sorted(TREND_PRODUCTS)}")
+    return product
+
+
+def zonal(params):
+    pollutant = _pollutant(params)
+    regions_stats = get_engine().zonal(pollutant)
+    return pd.DataFrame({"name": regions_stats["name"], "key": regions_stats["municipality"].astype(str),
+                         f"{pollutant}_Level": regions_stats["mean"].astype(float)})
+
+
+def trend(params):
+    product = _product(params)
+    try:
+        series = get_engine().trend_series(product, _param(params, "from"), _param(params, "to"), _param(params, "resample"))
+    except ValueError as e:
+        raise QueryError(str(e))
+    series["Date"] = series["Date"].dt.strftime("%Y-%m-%d")
+    return series
+
+
+def sdg_score(params):
+    pollutant = _pollutant(params)
+    engine = get_engine()
+    merged = engine.merged(pollutant)
+    # merged keeps the regions' row order; the display name comes from there.
+    table = merged[[f"{pollutant}_Level", "vehicle_per_1000", "housing_quality_index", "Total", "SDG_11_Score"]]
+    return table.assign(name=engine.regions()["name"].values, key=merged["Municipality"].values)[["name", "key", *table.columns]]
+
+
+def zonal_history(params):
+    pollutant = _pollutant(params)
+    history = get_engine().zonal_history(pollutant)
+    return history.rename(columns={"municipality": "key", "mean": f"{pollutant}_Level"})[
+        ["date", "source", "name", "key", f"{pollutant}_Level"]]
+
+
+ROUTES = {"/zonal": zonal, "/trend": trend, "/sdg-score": sdg_score, "/zonal-history": zonal_history}
+
+# Content key of the graph node behind each route. It is part of the cache key,
+# so an edited input file changes the response and its ETag without a restart.
+# /zonal-history reads the ingestion store, which the version check covers.
+ARTIFACTS = {
+    "/zonal": lambda params: get_engine().graph.key("zonal", pollutant=_pollutant(params)),
+    "/trend": lambda params: get_engine().graph.key("trend", product=_product(params)),
+    "/sdg-score": lambda params: get_engine().graph.key("scored", pollutant=_pollutant(params)),
+    "/zonal-history": lambda params: None,
+}
+
+
+def _param(params, name, default=None):
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+# ── Response cache ─────────────────────────────────────────────────────────
+class Response:
+    __slots__ = ("body", "gzipped", "etag", "content_type")
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6)
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.content_type = content_type
+
+
+_cache = OrderedDict()
+_cache_version = None
+_cache_lock = threading.Lock()
+
+
+def encode(df, fmt):
+    if fmt == "arrow":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise NotAcceptable("Arrow output needs pyarrow installed")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue(), ARROW_TYPE)
+    body = df.to_json(orient="records", double_precision=10).encode()
+    return Response(body, "application/json")
+
+
+def get_response(path, params, fmt):
+    global _cache_version
+    engine = get_engine()
+    engine.refresh()
+    if engine.data_version != _cache_version:
+        with _cache_lock:
+            _cache.clear()
+            _cache_version = engine.data_version
+    key = (path, tuple(sorted((k, tuple(v)) for k, v in params.items() if k != "format")), fmt,
+           ARTIFACTS[path](params))
+    with _cache_lock:
+        response = _cache.get(key)
+        if response is not None:
+            _cache.move_to_end(key)
+    if response is None:
+        response = encode(ROUTES[path](params), fmt)
+        with _cache_lock:
+            response = _cache.setdefault(key, response)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return response
+
+
+# ── HTTP ───────────────────────────────────────────────────────────────────
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if url.path not in ROUTES:
+            return self._error(404, f"unknown endpoint {url.path!r}; try {sorted(ROUTES)}")
+
+        fmt = _param(params, "format")
+        if fmt is None:
+            fmt = "arrow" if ARROW_TYPE in self.headers.get("Accept", "") else "json"
+        if fmt not in ("json", "arrow"):
+            return self._error(400, f"unknown format {fmt!r}")
+
+        try:
+            response = get_response(url.path, params, fmt)
+        except QueryError as e:
+            return self._error(e.status, str(e))
+        except Exception as e:
+            return self._error(500, f"{type(e).__name__}: {e}")
+
+        if response.etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", response.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        body = response.gzipped if use_gzip else response.body
+        self.send_response(200)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("ETag", response.etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept, Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        body = json.dumps({"error": message}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8502):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Turin dashboard data as a local JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+    print(f"Serving on http://{args.host}:{args.port} ({', '.join(sorted(ROUTES))})")
+    serve(args.host, args.port).serve_forever()
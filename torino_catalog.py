@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import rasterio
+
+from torino_data import DATA_DIR
+
+# Index of the rasters under DATA_DIR, built from file headers and GDAL PAM
+# .aux.xml sidecars; pixels are only read for rasters without sidecar stats,
+# once. The index is persisted in CACHE_DIR keyed by file mtime/size, so a
+# warm scan is one stat per file.
+
+CACHE_DIR = ".cache"
+CATALOG_VERSION = 1
+SPECIES = ("NO2", "SO2", "CH4", "O3", "HCHO", "CO")
+PAM_STATS = {
+    "STATISTICS_MINIMUM": "min",
+    "STATISTICS_MAXIMUM": "max",
+    "STATISTICS_MEAN": "mean",
+    "STATISTICS_STDDEV": "std",
+    "STATISTICS_VALID_PERCENT": "valid_percent",
+}
+DATE_RE = re.compile(r"(?<!\d)((?:19|20)\d{2})(?:[-_]?(0[1-9]|1[0-2]))?(?:[-_]?([0-2]\d|3[01]))?(?!\d)")
+
+
+@dataclass
+class RasterEntry:
+    path: str
+    pollutant: Optional[str]
+    date: Optional[str]
+    description: str
+    width: int
+    height: int
+    bounds: Tuple[float, float, float, float]
+    transform: Tuple[float, ...]
+    crs: Optional[str]
+    nodata: Optional[float]
+    dtype: str
+    stats: Dict[str, float] = field(default_factory=dict)
+    stats_source: str = "aux.xml"
+    signature: Tuple = ()
+
+    @property
+    def grid(self):
+        return (self.width, self.height, tuple(round(v, 9) for v in self.transform), self.crs)
+
+
+def read_pam_stats(path):
+    """Band 1 statistics from a GDAL PAM sidecar, or None."""
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return None
+    stats = {}
+    for band in root.iter("PAMRasterBand"):
+        if band.get("band", "1") != "1":
+            continue
+        for mdi in band.iter("MDI"):
+            if mdi.get("key") in PAM_STATS:
+                stats[PAM_STATS[mdi.get("key")]] = float(mdi.text)
+    return stats if {"min", "max"} <= stats.keys() else None
+
+
+def compute_stats(path, nodata=None):
+    with rasterio.open(path) as src:
+        arr = src.read(1, out_dtype="float64")
+    if nodata is not None:
+        arr[arr == nodata] = np.nan
+    valid = arr[np.isfinite(arr)]
+    if not valid.size:
+        return {"min": float("nan"), "max": float("nan"), "mean": float("nan"), "std": float("nan"), "valid_percent": 0.0}
+    return {
+        "min": float(valid.min()),
+        "max": float(valid.max()),
+        "mean": float(valid.mean()),
+        "std": float(valid.std()),
+        "valid_percent": round(100 * valid.size / arr.size, 1),
+    }
+
+
+def species(description, filename):
+    """Pollutant named by the band description, else by a file name token."""
+    for token in re.split(r"[_\W]+", description or ""):
+        if token.upper() in SPECIES:
+            return token.upper()
+    for token in re.split(r"[_\W]+", os.path.splitext(filename)[0]):
+        for name in SPECIES:
+            if re.fullmatch(name + r"\d*", token, re.IGNORECASE):
+                return name
+    return None
+
+
+def file_date(filename):
+    match = DATE_RE.search(filename)
+    return "-".join(part for part in match.groups() if part) if match else None
+
+
+def _signature(path):
+    st = os.stat(path)
+    try:
+        aux = os.stat(path + ".aux.xml").st_mtime_ns
+    except OSError:
+        aux = None
+    return (st.st_mtime_ns, st.st_size, aux)
+
+
+def index_raster(path, signature=None):
+    """Catalog entry for one raster: header only, plus sidecar or computed stats."""
+    with rasterio.open(path) as src:
+        description = src.descriptions[0] or ""
+        entry = RasterEntry(
+            path=path,
+            pollutant=species(description, os.path.basename(path)),
+            date=file_date(os.path.basename(path)),
+            description=description,
+            width=src.width,
+            height=src.height,
+            bounds=tuple(src.bounds),
+            transform=tuple(src.transform)[:6],
+            crs=src.crs.to_string() if src.crs else None,
+            nodata=src.nodata,
+            dtype=src.dtypes[0],
+        )
+    stats = read_pam_stats(path + ".aux.xml")
+    if stats is None:
+        stats, entry.stats_source = compute_stats(path, entry.nodata), "computed"
+    entry.stats = stats
+    entry.signature = tuple(signature or _signature(path))
+    return entry
+
+
+class RasterCatalog:
+    def __init__(self, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self.entries: Dict[str, RasterEntry] = {}
+        self._primary = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache_path(self):
+        key = hashlib.sha1(os.path.abspath(self.data_dir).encode()).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"catalog-{key}.json")
+
+    def _load_index(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if index.get("version") != CATALOG_VERSION:
+            return {}
+        return {path: RasterEntry(**{**e, "bounds": tuple(e["bounds"]), "transform": tuple(e["transform"]),
+                                     "signature": tuple(e["signature"])})
+                for path, e in index["entries"].items()}
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # The app and the API both rescan after an ingest; a per-writer name keeps their temp files apart.
+        tmp = f"{self.cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CATALOG_VERSION, "entries": {p: asdict(e) for p, e in self.entries.items()}}, f)
+        os.replace(tmp, self.cache_path)
+
+    def scan(self):
+        """Refresh the index; only new or modified rasters are opened."""
+        with self._lock:
+            known = self.entries or self._load_index()
+            entries, changed = {}, False
+            with os.scandir(self.data_dir) as it:
+                for item in sorted(it, key=lambda e: e.name):
+                    if not item.is_file() or not item.name.lower().endswith((".tif", ".tiff")):
+                        continue
+                    signature = _signature(item.path)
+                    entry = known.get(item.path)
+                    if entry is None or entry.signature != signature:
+                        entry, changed = index_raster(item.path, signature), True
+                    entries[item.path] = entry
+            self.entries = entries
+            self._primary = self._pick_primary()
+            if changed or entries.keys() != known.keys():
+                self._save_index()
+            return self
+
+    def pollutants(self):
+        return list(self.primary())
+
+    def primary(self):
+        """One raster per pollutant, preferring the grid shared by the most pollutants."""
+        return dict(self._primary)
+
+    def _pick_primary(self):
+        by_pollutant = {}
+        for entry in self.entries.values():
+            if entry.pollutant:
+                by_pollutant.setdefault(entry.pollutant, []).append(entry)
+        grid_cover = Counter(grid for entries in by_pollutant.values() for grid in {e.grid for e in entries})
+
+        def rank(e):
+            return (grid_cover[e.grid], e.width * e.height, e.date or "", e.path)
+        return {p: max(by_pollutant[p], key=rank) for p in sorted(by_pollutant, key=SPECIES.index)}
+
+    def get(self, pollutant):
+        try:
+            return self._primary[pollutant]
+        except KeyError:
+            raise KeyError(f"no raster for {pollutant!r} in {self.data_dir}; found {self.pollutants()}") from None
+
+
+if __name__ == "__main__":
+    import time
+    start = time.perf_counter()
+    catalog = RasterCatalog().scan()
+    print(f"{len(catalog.entries)} rasters indexed in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for entry in catalog.entries.values():
+        print(f"{os.path.basename(entry.path):32} {entry.pollutant or '-':5} {entry.date or '-':8} "
+              f"{entry.width}x{entry.height} {entry.stats_source:8} [{entry.stats['min']:.4g}, {entry.stats['max']:.4g}]")
+    print("primary:", {p: os.path.basename(e.path) for p, e in catalog.primary().items()})
@@ -0,0 +1,127 @@
+import hashlib
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+# Pollutant × indicator correlations with uncertainty. All pairs are computed
+# at once as a standardised matrix product; bootstrap resamples and
+# permutations are drawn in batches and the batches spread over a process
+# pool. Results are cached on disk by a fingerprint of the input data.
+
+CACHE_DIR = ".cache"
+
+INDICATORS = [
+    "vehicle_per_1000", "mobility_score", "population_density", "housing_quality_index",
+    "healthcare_access_score", "clean_energy_access", "industrial_proximity_index", "Total"
+]
+
+METHODS = ("pearson", "spearman")
+# Resampled values (rows × pairs × draws) below which a process pool costs more
+# than it saves: ~4 s inline, against ~1 s to spawn each worker.
+PARALLEL_MIN_WORK = 50_000_000
+
+
+def _corr(x, y):
+    """Pearson r between every column of x and y; x, y are (..., n, p) and (..., n, q)."""
+    x = x - x.mean(axis=-2, keepdims=True)
+    y = y - y.mean(axis=-2, keepdims=True)
+    x = x / np.linalg.norm(x, axis=-2, keepdims=True)
+    y = y / np.linalg.norm(y, axis=-2, keepdims=True)
+    return np.swapaxes(x, -1, -2) @ y
+
+
+def _batch(task):
+    kind, x, y, method, size, seed = task
+    rng = np.random.default_rng(seed)
+    n = x.shape[0]
+    if kind == "bootstrap":
+        idx = rng.integers(0, n, size=(size, n))
+        xb, yb = x[idx], y[idx]
+    else:
+        idx = np.argsort(rng.random((size, n)), axis=1)
+        xb, yb = np.broadcast_to(x, (size,) + x.shape), y[idx]
+    if method == "spearman":
+        xb, yb = rankdata(xb, axis=-2), rankdata(yb, axis=-2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _corr(xb, yb)
+
+
+def _resample(kind, x, y, method, n, batch_size, seed, pool=None):
+    sizes = [min(batch_size, n - start) for start in range(0, n, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(kind, x, y, method, size, s) for size, s in zip(sizes, seeds)]
+    if pool is None or len(tasks) == 1:
+        return np.concatenate([_batch(t) for t in tasks])
+    return np.concatenate(list(pool.map(_batch, tasks)))
+
+
+def fingerprint(df, *params):
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update(repr((list(df.columns),) + params).encode())
+    return h.hexdigest()[:16]
+
+
+def correlation_table(df, pollutants, indicators=INDICATORS, methods=METHODS, n_boot=2000,
+                      n_perm=2000, ci=0.95, batch_size=500, seed=0, workers=None, cache_dir=CACHE_DIR):
+    """Long table of r, bootstrap CI and permutation p-value per pollutant, indicator and method.
+
+    Only rows where every selected column is present are used; ``n`` reports
+    how many that was. Indicators that are constant over those rows are dropped.
+    """
+    indicators = [c for c in indicators if c in df.columns]
+    data = df[list(pollutants) + indicators].apply(pd.to_numeric, errors="coerce").dropna()
+    indicators = [c for c in indicators if data[c].nunique() > 1]
+    data = data[list(pollutants) + indicators]
+
+    key = fingerprint(data, tuple(methods), n_boot, n_perm, ci, seed)
+    path = os.path.join(cache_dir, f"corr_{key}.pkl")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    x = data[list(pollutants)].to_numpy(dtype=float)
+    y = data[indicators].to_numpy(dtype=float)
+    n = len(data)
+    workers = workers or os.cpu_count() or 1
+    alpha = (1 - ci) / 2
+    # One pool for every resampling pass, and only when the work outweighs starting it.
+    work = n * x.shape[1] * y.shape[1] * (n_boot + n_perm) * len(methods)
+    parallel = workers > 1 and n > 2 and work >= PARALLEL_MIN_WORK
+
+    frames = []
+    # Spawned, not forked: callers run inside threaded servers (Streamlit, the API).
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) if parallel else nullcontext() as pool:
+        for m, method in enumerate(methods):
+            xs, ys = (rankdata(x, axis=0), rankdata(y, axis=0)) if method == "spearman" else (x, y)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r = _corr(xs, ys)
+            if n > 2:
+                boot = _resample("bootstrap", x, y, method, n_boot, batch_size, seed + m, pool)
+                perm = _resample("permutation", x, y, method, n_perm, batch_size, seed + 100 + m, pool)
+                low, high = np.nanquantile(boot, [alpha, 1 - alpha], axis=0)
+                p = (1 + (np.abs(perm) >= np.abs(r) - 1e-12).sum(axis=0)) / (n_perm + 1)
+            else:
+                low = high = p = np.full_like(r, np.nan)
+            frames.append(pd.DataFrame({
+                "pollutant": np.repeat(list(pollutants), len(indicators)),
+                "indicator": np.tile(indicators, len(pollutants)),
+                "method": method,
+                "r": r.ravel(),
+                "ci_low": low.ravel(),
+                "ci_high": high.ravel(),
+                "p_value": p.ravel(),
+                "n": n
+            }))
+    table = pd.concat(frames, ignore_index=True)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, "wb") as f:
+        pickle.dump(table, f)
+    return table
@@ -0,0 +1,180 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import rasterio
+import shapely
+
+# ── Input locations ────────────────────────────────────────────────────────
+DATA_DIR = "Torino"
+DATA_PATH = ""
+GEOJSON = "torino_only.geojson"
+CO_CSV = "Sentinel-5P CO-CO_VISUALIZED-2020-05-13T00_00_00.000Z-2025-05-13T23_59_59.999Z.csv"
+AER_CSV = "Sentinel-5P AER_AI-AER_AI_340_AND_380_VISUALIZED-2019-06-14T00_00_00.000Z-2024-06-14T23_59_59.999Z.csv"
+VEHICLE_CSV = "torino_vehicle_mobility.csv"
+SOCIO_CSV = "torino_socio_econ_factors.csv"
+POPULATION_CSV = "Resident population.csv"
+
+LOAD_TIMEOUT = 30
+
+# Only what the dashboard uses is kept: the municipality name, geometry snapped
+# to COORD_PRECISION degrees (~1 m), float32 values, and municipality keys
+# stored as one shared categorical (int16 codes) across all tables.
+REGION_COLUMNS = ["name"]
+COORD_PRECISION = 1e-5
+KEY_COLUMNS = {"vehicle": "municipality", "socio": "municipality", "population": "Municipality"}
+
+
+@dataclass
+class Raster:
+    path: str
+    arr: np.ndarray
+    bounds: Any
+    transform: Any
+    crs: Any
+    nodata: Optional[float]
+
+
+def municipality_key(names):
+    return names.str.lower().str.strip()
+
+
+def read_regions(path=GEOJSON, columns=REGION_COLUMNS, precision=COORD_PRECISION):
+    regions = gpd.read_file(path, columns=list(columns))
+    if regions.crs is None:
+        regions.set_crs(epsg=4326, inplace=True)
+    if precision:
+        regions["geometry"] = regions.geometry.set_precision(precision)
+    regions["municipality"] = municipality_key(regions["name"]).astype("category")
+    return regions
+
+
+def read_raster(path):
+    with rasterio.open(path) as src:
+        arr = src.read(1, out_dtype="float32")
+        if src.nodata is not None:
+            arr[arr == np.float32(src.nodata)] = np.nan
+        return Raster(path, arr, src.bounds, src.transform, src.crs, src.nodata)
+
+
+def mask_fill(raster):
+    """Copy of ``raster`` with the clip fill set to NaN.
+
+    The clipped GeoTIFFs declare no nodata and store exact 0.0 outside their
+    footprint; a column mean is never exactly zero, so those pixels are fill.
+    Rasters with a declared nodata are already masked by ``read_raster``.
+    """
+    if raster.nodata is not None:
+        return raster
+    arr = np.where(raster.arr == 0, np.float32(np.nan), raster.arr)
+    return Raster(raster.path, arr, raster.bounds, raster.transform, raster.crs, raster.nodata)
+
+
+def compact_frame(df):
+    for col in df.select_dtypes(include="number").columns:
+        kind = "integer" if pd.api.types.is_integer_dtype(df[col]) else "float"
+        df[col] = pd.to_numeric(df[col], downcast=kind)
+    return df
+
+
+def read_table(path):
+    return compact_frame(pd.read_csv(path))
+
+
+def read_sentinel_csv(path, value_name):
+    df = pd.read_csv(path, usecols=["C0/date", "C0/mean"], dtype={"C0/mean": "float32"})
+    df["C0/date"] = pd.to_datetime(df["C0/date"])
+    return df.rename(columns={"C0/date": "Date", "C0/mean": value_name})
+
+
+def encode_key(df, col, dtype):
+    """Copy of ``df`` with ``col`` recoded to the regions' categorical key dtype."""
+    return df.assign(**{col: municipality_key(df[col].astype(str)).astype(dtype)})
+
+
+def _frame_bytes(df):
+    # Categorical keys share one categories index; count only their codes here.
+    total = 0
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            total += df[col].cat.codes.nbytes
+        elif col == getattr(df, "_geometry_column_name", None):
+            # pandas only counts the geometry pointers; add the coordinate payload.
+            total += df[col].values.nbytes + int(shapely.get_num_coordinates(df[col].values).sum()) * 2 * 8
+        else:
+            total += int(df[col].memory_usage(deep=True, index=False))
+    return total
+
+
+def memory_report(structures):
+    """Bytes held by each structure in a ``{name: DataFrame or Raster}`` mapping."""
+    rows = []
+    for name, obj in structures.items():
+        if obj is None:
+            continue
+        if isinstance(obj, Raster):
+            rows.append({"structure": name, "rows": obj.arr.shape[0], "dtypes": str(obj.arr.dtype), "bytes": obj.arr.nbytes})
+        else:
+            rows.append({
+                "structure": name,
+                "rows": len(obj),
+                "dtypes": ", ".join(sorted({str(t) for t in obj.dtypes})),
+                "bytes": _frame_bytes(obj),
+            })
+    regions = structures.get("regions")
+    if regions is not None and "municipality" in regions:
+        categories = regions["municipality"].cat.categories
+        rows.append({"structure": "municipality keys", "rows": len(categories), "dtypes": "str",
+                     "bytes": int(categories.memory_usage(deep=True))})
+    report = pd.DataFrame(rows)
+    report = pd.concat([report, pd.DataFrame([{"structure": "total", "bytes": report["bytes"].sum()}])], ignore_index=True)
+    report["rows"] = report["rows"].astype("Int64")
+    return report
+
+
+def _timed(name, reader, timings):
+    def run():
+        start = time.perf_counter()
+        try:
+            return reader()
+        finally:
+            timings[name] = time.perf_counter() - start
+    return run
+
+
+def load_inputs(readers: Dict[str, Callable[[], Any]], timeout=LOAD_TIMEOUT, max_workers=None):
+    """Run independent readers concurrently; returns (results, errors, timings).
+
+    Each reader gets the same ``timeout``: since they all start together, the
+    call returns after the slowest reader or the timeout, whichever comes first.
+    Readers that fail or time out are reported in ``errors`` instead of raising.
+    """
+    results, errors, timings = {}, {}, {}
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(readers) or 1)
+    try:
+        futures = {pool.submit(_timed(name, reader, timings)): name for name, reader in readers.items()}
+        done, pending = wait(futures, timeout=timeout)
+        for future in done:
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+        for future in pending:
+            errors[futures[future]] = f"timed out after {timeout}s"
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results, errors, timings
+
+
+if __name__ == "__main__":
+    import sys
+    from torino_engine import DataEngine
+    engine = DataEngine()
+    pollutant = sys.argv[1] if len(sys.argv) > 1 else engine.default_pollutant
+    print(engine.memory_report(pollutant).to_string(index=False))
@@ -0,0 +1,292 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from torino_catalog import RasterCatalog
+from torino_correlation import correlation_table
+from torino_data import (AER_CSV, CO_CSV, DATA_DIR, DATA_PATH, GEOJSON, KEY_COLUMNS, LOAD_TIMEOUT,
+                         POPULATION_CSV, SOCIO_CSV, VEHICLE_CSV, encode_key, load_inputs, mask_fill,
+                         memory_report, read_raster, read_regions, read_sentinel_csv, read_table)
+from torino_export import FORMATS, export_file, export_table
+from torino_exposure import (exposure_weights, load_coverage_matrix, municipality_density, pixel_area_km2,
+                             zonal_exposure)
+from torino_graph import Graph
+from torino_hotspots import grid_weights, load_contiguity_weights, local_statistics
+from torino_ingest import Store, read_trend_store
+from torino_pipeline import TREND_PRODUCTS, merge_socio, normalize, sdg_scores, trend_series, zonal_means
+
+# One DataEngine per process, shared by every Streamlit session and the query
+# API. The derivations are nodes of a dependency graph (torino_graph) keyed by
+# the content of the input files, so each artifact is built on first use and
+# rebuilt only when something upstream of it changes. Returned objects are
+# shared: copy before adding columns. Files added by the ingestion daemon
+# (torino_ingest) are picked up by ``refresh``; zonal means it has already
+# computed are reused instead of recomputed.
+
+DEFAULT_POLLUTANT = "NO2"
+TREND_CSVS = {"CO": CO_CSV, "AER_AI": AER_CSV}
+SOCIO_CSVS = {"vehicle": VEHICLE_CSV, "socio": SOCIO_CSV, "population": POPULATION_CSV}
+
+
+class DataEngine:
+    def __init__(self, data_dir=DATA_DIR, data_path=DATA_PATH, store=None):
+        self.data_dir = data_dir
+        self.data_path = data_path
+        self.store = store or Store()
+        self.data_version = self.store.version()
+        self._refresh_lock = threading.Lock()
+        self.catalog = RasterCatalog(data_dir).scan()
+        pollutants = self.catalog.pollutants()
+        if not pollutants:
+            raise RuntimeError(f"No pollutant rasters found in {data_dir}")
+        self.default_pollutant = DEFAULT_POLLUTANT if DEFAULT_POLLUTANT in pollutants else pollutants[0]
+        self.graph = self._build_graph()
+
+        # Read the inputs the first page needs concurrently; failures are kept
+        # in ``errors`` and raised again by whichever artifact needs that input.
+        # A reader that times out keeps running and holds its node; other
+        # callers wait for it at most LOAD_TIMEOUT, then get a TimeoutError.
+        inputs = {
+            "regions": lambda: self.graph.get("regions"),
+            "raster": lambda: self.graph.get("raster", pollutant=self.default_pollutant),
+            **{f"trend {p}": (lambda p=p: self.graph.get("trend", product=p)) for p in TREND_CSVS},
+            **{name: (lambda n=name: self.graph.get(f"{n}_csv")) for name in SOCIO_CSVS},
+        }
+        _, self.errors, self.timings = load_inputs(inputs)
+        if "regions" in self.errors or "raster" in self.errors:
+            raise RuntimeError(f"Could not load map inputs: {self.errors}")
+
+    def _build_graph(self):
+        g = Graph(wait_timeout=LOAD_TIMEOUT)
+        base = {"pollutant": self.default_pollutant}
+
+        # ── Sources ────────────────────────────────────────────────────────
+        g.source("regions", lambda: GEOJSON, lambda path: read_regions(path))
+        g.source("raster", lambda pollutant: self.entry(pollutant).path,
+                 lambda path, pollutant: read_raster(path), params=("pollutant",))
+        g.source("trend", self._trend_path, self._read_trend, params=("product",))
+        for name, csv in SOCIO_CSVS.items():
+            g.source(f"{name}_csv", lambda csv=csv: os.path.join(self.data_path, csv), lambda path: read_table(path))
+            # Municipality keys share the regions' categorical dtype, so joins run on int codes.
+            g.add(name, lambda regions, df, col=KEY_COLUMNS[name]: encode_key(df, col, regions["municipality"].dtype),
+                  deps=("regions", f"{name}_csv"))
+
+        # ── Per pollutant ──────────────────────────────────────────────────
+        def normalized(raster, pollutant):
+            stats = self.entry(pollutant).stats
+            return normalize(raster.arr, stats["min"], stats["max"])
+        g.add("normalized", normalized, deps=("raster",), params=("pollutant",))
+        # Raster with the clip fill (exact 0.0 outside the footprint) as NaN, for statistics.
+        g.add("masked", lambda raster, pollutant: mask_fill(raster), deps=("raster",), params=("pollutant",))
+
+        def zonal(regions, raster, pollutant):
+            stored = self.store.zonal(raster.path, g.digest(GEOJSON))
+            if stored is not None and (stored["name"].values == regions["name"].values).all():
+                return pd.DataFrame({"name": regions["name"].values, "municipality": regions["municipality"].values,
+                                     "mean": stored["mean"].to_numpy(dtype="float32")})
+            return zonal_means(regions, raster)
+        g.add("zonal", zonal, deps=("regions", "raster"), params=("pollutant",))
+        g.add("merged", lambda zonal, vehicle, socio, population, pollutant:
+              merge_socio(zonal, pollutant, vehicle, socio, population),
+              deps=("zonal", "vehicle", "socio", "population"), params=("pollutant",))
+
+        def scored(merged, pollutant):
+            merged = merged.copy()
+            merged["SDG_11_Score"] = sdg_scores(merged, pollutant, self.entry(pollutant).stats["max"])
+            return merged
+        g.add("scored", scored, deps=("merged",), params=("pollutant",))
+
+        # ── Spatial statistics ─────────────────────────────────────────────
+        g.add("center", lambda regions: regions.geometry.centroid.iloc[0].coords[0][::-1], deps=("regions",))
+        g.add("contiguity", load_contiguity_weights, deps=("regions",))
+
+        # Statistics run on the masked raster: municipalities and pixels with no
+        # data coverage are left out instead of entering as a block of zeros.
+        def hotspot_deps(pollutant, level):
+            if level == "municipality":
+                return [("regions", {}), ("contiguity", {}), ("masked", {"pollutant": pollutant})]
+            if level == "pixel":
+                return [("masked", {"pollutant": pollutant})]
+            raise ValueError(f"unknown level {level!r}; expected 'municipality' or 'pixel'")
+
+        def hotspots(*inputs, pollutant, level):
+            if level == "municipality":
+                regions, weights, masked = inputs
+                stats = local_statistics(zonal_means(regions, masked)["mean"].to_numpy(), weights)
+                stats.insert(0, "Municipality", regions["municipality"].astype(str).values)
+                return stats
+            arr = inputs[0].arr
+            valid = np.isfinite(arr)
+            stats = local_statistics(arr[valid], grid_weights(valid))
+            rows, cols = np.nonzero(valid)
+            stats.insert(0, "row", rows.astype(np.int32))
+            stats.insert(1, "col", cols.astype(np.int32))
+            return stats
+        g.add("hotspots", hotspots, deps=hotspot_deps, params=("pollutant", "level"))
+
+        # ── Exposure and correlations (every pollutant on the base grid) ───
+        def weights(regions, grid, socio, population):
+            shape = grid.arr.shape
+            coverage = load_coverage_matrix(regions, grid.transform, shape)
+            pixel_km2 = pixel_area_km2(grid.transform, shape)
+            density = municipality_density(regions["name"], socio, population, coverage @ pixel_km2)
+            return exposure_weights(coverage, pixel_km2, density)
+        g.add("exposure_weights", weights,
+              deps=lambda: [("regions", {}), ("raster", base), ("socio", {}), ("population", {})])
+
+        def exposure(regions, weights, *rasters):
+            table = pd.DataFrame(zonal_exposure(weights, np.stack([r.arr for r in rasters])), columns=self._same_grid())
+            table.insert(0, "Municipality", regions["municipality"].astype(str).values)
+            return table
+        g.add("exposure", exposure, deps=lambda: [("regions", {}), ("exposure_weights", {})]
+              + [("masked", {"pollutant": p}) for p in self._same_grid()])
+
+        def correlations(exposure, scored):
+            pollutants = [c for c in exposure.columns if c != "Municipality"]
+            indicators = scored.drop(columns=pollutants + ["SDG_11_Score"], errors="ignore")
+            return correlation_table(exposure.merge(indicators, on="Municipality", how="inner"), pollutants)
+        g.add("correlations", correlations, deps=lambda: [("exposure", {}), ("scored", base)])
+
+        # ── Exports ────────────────────────────────────────────────────────
+        def export_deps(dataset, key, fmt):
+            geo = FORMATS[fmt][2]
+            if dataset in ("merged", "zonal"):
+                table = "scored" if dataset == "merged" else "zonal"
+                return [(table, {"pollutant": key})] + ([("regions", {})] if geo else [])
+            if dataset == "trend":
+                if geo:
+                    raise ValueError("trend series have no geometry")
+                return [("trend", {"product": key})]
+            raise ValueError(f"unknown dataset {dataset!r}")
+
+        def export(table, regions=None, *, dataset, key, fmt):
+            if dataset == "trend":
+                table = trend_series(table, TREND_PRODUCTS[key])
+            else:
+                if dataset == "zonal":
+                    table = pd.DataFrame({"Municipality": table["name"], f"{key}_Level": table["mean"]})
+                table = export_table(table, regions)
+            return export_file(table, f"{dataset}_{key}", fmt)
+        g.add("export", export, deps=export_deps, params=("dataset", "key", "fmt"))
+        return g
+
+    def _trend_path(self, product):
+        # Once the daemon has run, the store holds the bundled CSV plus every new export.
+        index = self.store.trend_index(product)
+        return index if os.path.exists(index) else os.path.join(self.data_path, TREND_CSVS[product])
+
+    def _read_trend(self, path, product):
+        if path.endswith(".json"):
+            return read_trend_store(path, product)
+        return read_sentinel_csv(path, TREND_PRODUCTS[product])
+
+    def refresh(self):
+        """Rescan the rasters if the ingestion store changed; True when it did.
+
+        Only a stat of the store's version file, so it is cheap to call on
+        every rerun. Changed inputs then rebuild just their downstream nodes.
+        """
+        version = self.store.version()
+        if version == self.data_version:
+            return False
+        with self._refresh_lock:
+            if version == self.data_version:
+                return False
+            self.catalog.scan()
+            self.data_version = version
+        return True
+
+    def _same_grid(self):
+        base = self.entry(self.default_pollutant).grid
+        return [p for p in self.pollutants if self.entry(p).grid == base]
+
+    # ── Inputs ─────────────────────────────────────────────────────────────
+    @property
+    def pollutants(self):
+        return self.catalog.pollutants()
+
+    def entry(self, pollutant):
+        """Catalog metadata (grid, CRS, nodata, stats) for the pollutant's raster; no pixel read."""
+        return self.catalog.get(pollutant)
+
+    def regions(self):
+        return self.graph.get("regions")
+
+    def center(self):
+        return self.graph.get("center")
+
+    def raster(self, pollutant):
+        return self.graph.get("raster", pollutant=pollutant)
+
+    def socio_tables(self):
+        return tuple(self.graph.get(name) for name in SOCIO_CSVS)
+
+    def trend(self, product):
+        return self.graph.get("trend", product=product)
+
+    def inputs(self, pollutant):
+        """The loaded inputs for ``pollutant``, by name: regions, raster, trends and socio tables."""
+        structures = {"regions": self.regions(), "raster": self.raster(pollutant)}
+        structures.update({f"trend {p}": self.trend(p) for p in TREND_CSVS})
+        structures.update(zip(SOCIO_CSVS, self.socio_tables()))
+        return structures
+
+    def memory_report(self, pollutant):
+        """Bytes held by each loaded input (see torino_data.memory_report)."""
+        return memory_report(self.inputs(pollutant))
+
+    # ── Derived ────────────────────────────────────────────────────────────
+    def normalized(self, pollutant):
+        """(norm, vmin, vmax) for the pollutant raster, with bounds from the catalog stats."""
+        return self.graph.get("normalized", pollutant=pollutant)
+
+    def zonal(self, pollutant):
+        return self.graph.get("zonal", pollutant=pollutant)
+
+    def merged(self, pollutant):
+        """Municipality × pollutant × socio-economic table with SDG_11_Score."""
+        return self.graph.get("scored", pollutant=pollutant)
+
+    def trend_series(self, product, start=None, end=None, resample=None):
+        return trend_series(self.trend(product), TREND_PRODUCTS[product], start, end, resample)
+
+    def exposure(self):
+        """Population-weighted exposure per municipality for every pollutant on the base grid."""
+        return self.graph.get("exposure")
+
+    def correlations(self):
+        """Correlation table of every pollutant's exposure against the socio-economic indicators."""
+        return self.graph.get("correlations")
+
+    def hotspots(self, pollutant, level="municipality"):
+        """Local Moran's I / Gi* per municipality (contiguity) or per valid pixel (8-neighbour grid)."""
+        return self.graph.get("hotspots", pollutant=pollutant, level=level)
+
+    def zonal_history(self, pollutant):
+        """Municipality means of every ingested raster for ``pollutant``, by source file and date."""
+        return self.store.zonal_history(pollutant)
+
+    # ── Exports ────────────────────────────────────────────────────────────
+    def export(self, dataset, key, fmt):
+        """Path of the exported file; written once per data fingerprint and format."""
+        path = self.graph.get("export", dataset=dataset, key=key, fmt=fmt)
+        if not os.path.exists(path):
+            # The export directory was cleaned out from under us.
+            self.graph.invalidate("export")
+            path = self.graph.get("export", dataset=dataset, key=key, fmt=fmt)
+        return path
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The process-wide DataEngine, created on first call."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = DataEngine()
+        return _engine
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import uuid
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+# Chunked writers for the download buttons. Each writer streams CHUNK_ROWS
+# rows at a time to a temp file, so only one chunk is ever encoded in memory.
+# Finished files are kept in EXPORT_DIR and named by a fingerprint of the
+# data, so repeat downloads (from any session) just read the file back.
+
+CACHE_DIR = ".cache"
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+CHUNK_ROWS = 50_000
+
+# format: (file extension, mime type, needs geometry)
+FORMATS = {
+    "csv": (".csv", "text/csv", False),
+    "parquet": (".parquet", "application/vnd.apache.parquet", False),
+    "gpkg": (".gpkg", "application/geopackage+sqlite3", True),
+    "geoparquet": (".geo.parquet", "application/vnd.apache.parquet", True),
+}
+
+
+def fingerprint(df):
+    """Content hash of a (Geo)DataFrame: column names, dtypes, values and geometry."""
+    h = hashlib.sha1()
+    geometry = df.geometry.name if isinstance(df, gpd.GeoDataFrame) else None
+    h.update(json.dumps([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    values = df.drop(columns=[geometry]) if geometry else df
+    h.update(pd.util.hash_pandas_object(values, index=False).values.tobytes())
+    if geometry:
+        h.update(str(df.crs).encode())
+        for chunk in _chunks(df[geometry], CHUNK_ROWS):
+            h.update(b"".join(shapely.to_wkb(chunk.values)))
+    return h.hexdigest()
+
+
+def _chunks(df, rows):
+    for start in range(0, len(df), rows):
+        yield df.iloc[start:start + rows]
+
+
+def write_csv(df, path, chunk_rows=CHUNK_ROWS):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(_chunks(df, chunk_rows)):
+            chunk.to_csv(f, header=i == 0, index=False)
+
+
+def _arrow_chunk(chunk, geometry=None):
+    import pyarrow as pa
+    if geometry is None:
+        return pa.Table.from_pandas(chunk, preserve_index=False)
+    table = pa.Table.from_pandas(pd.DataFrame(chunk.drop(columns=geometry)), preserve_index=False)
+    return table.append_column(geometry, pa.array(shapely.to_wkb(chunk[geometry].values), pa.binary()))
+
+
+def _geo_metadata(gdf):
+    # GeoParquet 1.1 file metadata; the bbox is over the whole frame, not the first chunk.
+    col = gdf.geometry.name
+    return {
+        "version": "1.1.0",
+        "primary_column": col,
+        "columns": {col: {
+            "encoding": "WKB",
+            "geometry_types": sorted(set(gdf.geometry.geom_type.dropna())),
+            "bbox": [float(v) for v in gdf.total_bounds],
+            "crs": gdf.crs.to_json_dict() if gdf.crs else None,
+        }},
+    }
+
+
+def write_parquet(df, path, chunk_rows=CHUNK_ROWS, geometry=None):
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for chunk in _chunks(df, chunk_rows):
+            table = _arrow_chunk(chunk, geometry)
+            if writer is None:
+                schema = table.schema
+                if geometry:
+                    schema = schema.with_metadata({**(schema.metadata or {}),
+                                                   b"geo": json.dumps(_geo_metadata(df)).encode()})
+                writer = pq.ParquetWriter(path, schema, compression="zstd")
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_geoparquet(gdf, path, chunk_rows=CHUNK_ROWS):
+    write_parquet(gdf, path, chunk_rows, geometry=gdf.geometry.name)
+
+
+def write_gpkg(gdf, path, chunk_rows=CHUNK_ROWS, layer="data"):
+    import pyogrio
+    for i, chunk in enumerate(_chunks(gdf, chunk_rows)):
+        pyogrio.write_dataframe(chunk, path, layer=layer, driver="GPKG", append=i > 0)
+
+
+WRITERS = {"csv": write_csv, "parquet": write_parquet, "gpkg": write_gpkg, "geoparquet": write_geoparquet}
+
+
+def export_file(df, name, fmt, export_dir=EXPORT_DIR, chunk_rows=CHUNK_ROWS):
+    """Path of ``df`` written as ``fmt``, reusing an earlier file with the same fingerprint."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}; expected one of {sorted(FORMATS)}")
+    ext, _, geo = FORMATS[fmt]
+    if geo and not isinstance(df, gpd.GeoDataFrame):
+        raise ValueError(f"{fmt} export needs a GeoDataFrame")
+    if not geo and isinstance(df, gpd.GeoDataFrame):
+        df = pd.DataFrame(df.drop(columns=df.geometry.name))
+    path = os.path.join(export_dir, f"{name}-{fingerprint(df)[:16]}{ext}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(export_dir, exist_ok=True)
+    # Write under a unique name and rename, so concurrent sessions never read a partial file.
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp{ext}"
+    try:
+        WRITERS[fmt](df, tmp, chunk_rows, **({"layer": name} if fmt == "gpkg" else {}))
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def export_table(df, regions=None):
+    """Export-ready copy: internal categorical keys dropped, geometry attached when ``regions`` is given."""
+    table = df.drop(columns=[c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)])
+    if regions is None:
+        return table
+    if len(table) != len(regions):
+        raise ValueError("table rows do not line up with the regions")
+    return gpd.GeoDataFrame(table.reset_index(drop=True), geometry=np.asarray(regions.geometry.values), crs=regions.crs)
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def download_buttons(engine, dataset, key, formats=None):
+    """One download button per format; the file is only produced when clicked."""
+    import streamlit as st
+    formats = formats or list(FORMATS)
+    for col, fmt in zip(st.columns(len(formats)), formats):
+        ext, mime, _ = FORMATS[fmt]
+        col.download_button(
+            f"⬇️ {fmt}",
+            data=lambda fmt=fmt: _read_bytes(engine.export(dataset, key, fmt)),
+            file_name=f"{dataset}_{key}{ext}",
+            mime=mime,
+            key=f"download_{dataset}_{key}_{fmt}",
+            on_click="ignore",
+        )
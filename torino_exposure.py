@@ -0,0 +1,141 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import sparse
+
+# Municipality × pixel weights for zonal means. Each entry is the exact
+# fraction of a pixel covered by a municipality polygon, so boundary pixels
+# count in proportion to their overlap instead of all-or-nothing. The matrix
+# only depends on the geometry and the raster grid, so it is cached on disk
+# and every pollutant on the same grid reuses it.
+
+CACHE_DIR = ".cache"
+KM_PER_DEGREE = 111.32
+
+
+def _grid_key(geometries, transform, shape):
+    h = hashlib.sha1()
+    h.update(repr((tuple(transform)[:6], tuple(shape))).encode())
+    for wkb in shapely.to_wkb(np.asarray(geometries)):
+        h.update(wkb or b"")
+    return h.hexdigest()[:16]
+
+
+def coverage_matrix(geometries, transform, shape):
+    """Sparse (n_geometries × n_pixels) matrix of covered pixel fractions."""
+    height, width = shape
+    pixel_area = abs(transform.a * transform.e)
+    inverse = ~transform
+    rows, cols, data = [], [], []
+
+    for i, geom in enumerate(geometries):
+        if geom is None or geom.is_empty:
+            continue
+        minx, miny, maxx, maxy = geom.bounds
+        c0, r0 = inverse * (minx, maxy)
+        c1, r1 = inverse * (maxx, miny)
+        c0, c1 = sorted((c0, c1))
+        r0, r1 = sorted((r0, r1))
+        c0, r0 = max(int(np.floor(c0)), 0), max(int(np.floor(r0)), 0)
+        c1, r1 = min(int(np.ceil(c1)), width), min(int(np.ceil(r1)), height)
+        if c0 >= c1 or r0 >= r1:
+            continue
+
+        rr, cc = np.meshgrid(np.arange(r0, r1), np.arange(c0, c1), indexing="ij")
+        rr, cc = rr.ravel(), cc.ravel()
+        x0 = transform.c + cc * transform.a
+        y0 = transform.f + rr * transform.e
+        x1, y1 = x0 + transform.a, y0 + transform.e
+        boxes = shapely.box(np.minimum(x0, x1), np.minimum(y0, y1), np.maximum(x0, x1), np.maximum(y0, y1))
+        shapely.prepare(geom)
+        hit = shapely.intersects(geom, boxes)
+        if not hit.any():
+            continue
+        frac = shapely.area(shapely.intersection(boxes[hit], geom)) / pixel_area
+
+        keep = frac > 0
+        rows.append(np.full(keep.sum(), i))
+        cols.append(rr[hit][keep] * width + cc[hit][keep])
+        data.append(frac[keep])
+
+    if not data:
+        return sparse.csr_matrix((len(geometries), height * width))
+    return sparse.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(geometries), height * width)
+    )
+
+
+def load_coverage_matrix(regions, transform, shape, cache_dir=CACHE_DIR):
+    """``coverage_matrix`` for ``regions`` on this grid, computed once and cached as .npz."""
+    geometries = regions.geometry.values
+    path = os.path.join(cache_dir, f"coverage_{_grid_key(geometries, transform, shape)}.npz")
+    if os.path.exists(path):
+        return sparse.load_npz(path)
+    coverage = coverage_matrix(geometries, transform, shape)
+    os.makedirs(cache_dir, exist_ok=True)
+    sparse.save_npz(path, coverage)
+    return coverage
+
+
+def pixel_area_km2(transform, shape):
+    height, width = shape
+    lat = transform.f + (np.arange(height) + 0.5) * transform.e
+    area = abs(transform.a * transform.e) * KM_PER_DEGREE ** 2 * np.cos(np.radians(lat))
+    return np.repeat(area, width)
+
+
+def municipality_density(names, socio=None, population=None, coverage_km2=None):
+    """Residents per km² for each name, from population_density or Total / covered area.
+
+    Municipalities missing from both tables fall back to the median known density.
+    """
+    keys = pd.Series(names).str.lower().str.strip()
+    density = pd.Series(np.nan, index=keys.index)
+    if socio is not None:
+        lookup = socio.assign(key=socio["municipality"].str.lower().str.strip()).groupby("key")["population_density"].mean()
+        density = keys.map(lookup)
+    if population is not None and coverage_km2 is not None:
+        totals = population.assign(key=population["Municipality"].str.lower().str.strip()).groupby("key")["Total"].sum()
+        from_totals = keys.map(totals) / np.where(coverage_km2 > 0, coverage_km2, np.nan)
+        density = density.fillna(from_totals)
+    fallback = density.median() if density.notna().any() else 1.0
+    return density.fillna(fallback).to_numpy(dtype=float)
+
+
+def exposure_weights(coverage, area_km2, density=None, population=None):
+    """Municipality × pixel weights for ``zonal_exposure``.
+
+    By default each municipality weighs its pixels by the area it covers
+    times its own population density, so a shared boundary pixel never takes
+    a neighbour's density. That density is one number per municipality, so it
+    cancels when the weights are normalised and the result equals area
+    weighting. ``population`` (residents per pixel, flat) replaces it with a
+    real gridded population layer when one is available.
+    """
+    if population is not None:
+        return coverage.multiply(np.asarray(population).ravel()).tocsr()
+    weights = coverage.multiply(np.asarray(area_km2).ravel())
+    if density is not None:
+        weights = weights.multiply(np.asarray(density, dtype=float)[:, None])
+    return weights.tocsr()
+
+
+def zonal_exposure(weights, rasters):
+    """Weighted mean of one raster (2-D) or a stack (k × H × W) per municipality.
+
+    NaN pixels are left out and the remaining weights renormalised, so the
+    result is ``weights @ x / weights @ valid`` for every band at once.
+    """
+    stack = np.asarray(rasters, dtype=float)
+    single = stack.ndim == 2
+    values = stack.reshape(1 if single else stack.shape[0], -1).T
+    valid = np.isfinite(values)
+    num = weights @ np.where(valid, values, 0.0)
+    den = weights @ valid.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(den > 0, num / den, np.nan)
+    return out[:, 0] if single else out
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+
+# A DAG of named artifacts. Source nodes read a file and are keyed by a hash
+# of its contents; every other node is keyed by its name, its parameters and
+# its dependencies' keys. A node is recomputed only when its key changes, so
+# a new input file or a different parameter reruns just the nodes downstream
+# of it. One value is kept per node and parameter set, the latest.
+
+
+@dataclass
+class Node:
+    name: str
+    fn: Callable
+    deps: Callable          # (**params) -> [(dep name, dep params), ...]
+    params: Tuple[str, ...]
+    path: Optional[Callable] = None     # source nodes: (**params) -> file path
+
+
+def _freeze(params):
+    return tuple(sorted(params.items()))
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class Graph:
+    def __init__(self, history=500, wait_timeout=None):
+        self.nodes = {}
+        # Longest a caller waits for another thread computing the same slot;
+        # None waits indefinitely.
+        self.wait_timeout = wait_timeout
+        self._values = {}       # (name, params) -> (key, value)
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._digests = {}      # path -> ((mtime_ns, size), sha1)
+        self.stats = {}         # name -> counters and timings
+        self.history = deque(maxlen=history)
+
+    # ── Declaring nodes ────────────────────────────────────────────────────
+    def add(self, name, fn, deps=(), params=(), path=None):
+        """Register ``fn(*dep_values, **params)``.
+
+        ``deps`` is a list of node names, called with the subset of this
+        node's params they declare, or a callable ``(**params) -> [(name,
+        params), ...]`` for dependencies that vary with the parameters.
+        """
+        if not callable(deps):
+            names = tuple(deps)
+            deps = lambda **p: [(d, p) for d in names]
+        self.nodes[name] = Node(name, fn, deps, tuple(params), path)
+        self.stats.setdefault(name, {"runs": 0, "hits": 0, "last_s": None, "total_s": 0.0, "last_run": None})
+        return fn
+
+    def source(self, name, path, reader, params=()):
+        """File-backed node; ``path(**params)`` names the file, ``reader(path, **params)`` loads it."""
+        return self.add(name, lambda **p: reader(path(**p), **p), (), params, path)
+
+    def _params(self, name, params):
+        return {k: params[k] for k in self.nodes[name].params if k in params}
+
+    def _dependencies(self, name, params):
+        return [(dep, self._params(dep, p)) for dep, p in self.nodes[name].deps(**params)]
+
+    # ── Keys ───────────────────────────────────────────────────────────────
+    def digest(self, path):
+        """SHA-1 of a file's contents, re-read only when its mtime or size changes."""
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        digest = file_digest(path)
+        with self._lock:
+            self._digests[path] = (stamp, digest)
+        return digest
+
+    def key(self, name, **params):
+        """Content key of a node: file hash for sources, else a hash over the dependency keys."""
+        params = self._params(name, params)
+        node = self.nodes[name]
+        h = hashlib.sha1(repr((name, _freeze(params))).encode())
+        if node.path is not None:
+            path = node.path(**params)
+            h.update(os.path.abspath(path).encode())
+            h.update(self.digest(path).encode())
+        for dep, dep_params in self._dependencies(name, params):
+            h.update(self.key(dep, **dep_params).encode())
+        return h.hexdigest()
+
+    # ── Evaluation ─────────────────────────────────────────────────────────
+    def get(self, name, **params):
+        if name not in self.nodes:
+            raise KeyError(f"unknown artifact {name!r}")
+        params = self._params(name, params)
+        key = self.key(name, **params)
+        slot = (name, _freeze(params))
+        with self._lock:
+            lock = self._locks.setdefault(slot, threading.Lock())
+        # Dependencies are resolved while holding this slot's lock; they sit
+        # strictly upstream, so locks are always taken in DAG order.
+        if not lock.acquire(timeout=-1 if self.wait_timeout is None else self.wait_timeout):
+            raise TimeoutError(f"{_label(name, params)} is still being computed elsewhere after {self.wait_timeout}s")
+        try:
+            cached = self._values.get(slot)
+            if cached is not None and cached[0] == key:
+                with self._lock:
+                    self.stats[name]["hits"] += 1
+                return cached[1]
+            inputs = [self.get(dep, **dep_params) for dep, dep_params in self._dependencies(name, params)]
+            start = time.perf_counter()
+            value = self.nodes[name].fn(*inputs, **params)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._values[slot] = (key, value)
+        finally:
+            lock.release()
+        with self._lock:
+            stats = self.stats[name]
+            stats["runs"] += 1
+            stats["last_s"] = elapsed
+            stats["total_s"] += elapsed
+            stats["last_run"] = time.time()
+            self.history.append({"node": name, "params": params, "seconds": elapsed, "finished": stats["last_run"],
+                                 "reason": "changed" if cached is not None else "first"})
+        return value
+
+    def invalidate(self, name=None):
+        """Drop memoised values (of one node, or all); file digests are re-read next time."""
+        with self._lock:
+            for slot in [s for s in self._values if name is None or s[0] == name]:
+                del self._values[slot]
+            self._digests.clear()
+
+    # ── Inspection ─────────────────────────────────────────────────────────
+    def report(self):
+        """One row per node: how often it ran or was served from memory, and its timings."""
+        # Other sessions' threads write these while we read; work on copies.
+        with self._lock:
+            stats = {name: dict(s) for name, s in self.stats.items()}
+            memoised = [slot[0] for slot in self._values]
+        rows = []
+        for name, s in stats.items():
+            rows.append({
+                "node": name,
+                "kind": "source" if self.nodes[name].path else "derived",
+                "runs": s["runs"],
+                "hits": s["hits"],
+                "last_ms": None if s["last_s"] is None else round(s["last_s"] * 1000, 1),
+                "total_ms": round(s["total_s"] * 1000, 1),
+                "last_run": pd.to_datetime(s["last_run"], unit="s") if s["last_run"] else None,
+                "memoised": memoised.count(name),
+            })
+        return pd.DataFrame(rows)
+
+    def runs(self):
+        """Most recent computations, newest first."""
+        with self._lock:
+            history = list(self.history)
+        df = pd.DataFrame(history[::-1], columns=["node", "params", "seconds", "finished", "reason"])
+        df["params"] = df["params"].map(lambda p: ", ".join(f"{k}={v}" for k, v in p.items()))
+        df["finished"] = pd.to_datetime(df["finished"], unit="s")
+        return df
+
+    def edges(self, **params):
+        """(dependency, node) pairs of the graph as instantiated for ``params``."""
+        seen, edges = set(), []
+
+        def walk(name, p):
+            if (name, _freeze(p)) in seen:
+                return
+            seen.add((name, _freeze(p)))
+            for dep, dep_params in self._dependencies(name, p):
+                edges.append((_label(dep, dep_params), _label(name, p)))
+                walk(dep, dep_params)
+
+        for name, node in self.nodes.items():
+            if set(node.params) <= params.keys():
+                walk(name, self._params(name, params))
+        return list(dict.fromkeys(edges))
+
+    def to_dot(self, **params):
+        lines = ["digraph pipeline {", "  rankdir=LR;", "  node [shape=box, fontsize=10];"]
+        lines += [f'  "{a}" -> "{b}";' for a, b in self.edges(**params)]
+        return "\n".join(lines + ["}"])
+
+
+def _label(name, params):
+    return f"{name}({', '.join(str(v) for v in params.values())})" if params else name
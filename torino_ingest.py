@@ -0,0 +1,316 @@
+"""Watched-directory ingestion for new rasters and Sentinel-5P exports.
+
+    python torino_ingest.py                # watch Torino/ and the CSV drop location
+    python torino_ingest.py --once         # ingest whatever is there and exit
+
+New or changed GeoTIFFs in the data directory and ``Sentinel-5P *.csv``
+exports in the CSV directory are validated, then only that file's
+contribution is appended to the store: one Parquet part of zonal means per
+raster, one part of daily values per export. The bundled CO and aerosol
+series are ingested too, so new exports extend them wherever they are
+dropped. Every batch bumps the store
+version; running dashboards and the query API poll it (one stat) and pick up
+the new data without a restart.
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import rasterio
+
+from torino_catalog import file_date, species
+from torino_data import AER_CSV, CO_CSV, DATA_DIR, DATA_PATH, GEOJSON, read_raster, read_regions
+from torino_graph import file_digest
+from torino_pipeline import TREND_PRODUCTS, zonal_means
+
+CACHE_DIR = ".cache"
+STORE_DIR = os.path.join(CACHE_DIR, "store")
+CSV_PATTERN = "Sentinel-5P *.csv"
+PRODUCT_RE = re.compile(r"^Sentinel-5P ([A-Z0-9_]+?)-")
+RASTER_EXTENSIONS = (".tif", ".tiff")
+BUNDLED_TRENDS = (CO_CSV, AER_CSV)
+POLL_INTERVAL = 2.0
+# Files modified more recently than this are assumed to still be copying.
+SETTLE_SECONDS = 2.0
+
+
+class ValidationError(Exception):
+    pass
+
+
+def _signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _write_json(path, obj):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _read_json(path, default):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+# ── Store ──────────────────────────────────────────────────────────────────
+class Store:
+    """Append-only zonal and trend parts plus a manifest of ingested files."""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.version_path = os.path.join(root, "version")
+
+    def manifest(self):
+        return _read_json(self.manifest_path, {})
+
+    def version(self):
+        """Cheap change token: the version file's mtime, or None before the first ingest."""
+        try:
+            return os.stat(self.version_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def bump(self):
+        os.makedirs(self.root, exist_ok=True)
+        count = int(_read_json(self.version_path, 0)) + 1
+        _write_json(self.version_path, count)
+        return count
+
+    def trend_index(self, product):
+        return os.path.join(self.root, f"trend_{product}.json")
+
+    def _part(self, kind, source, digest):
+        # Parts record their source file, so two identical files still get one part each.
+        folder = os.path.join(self.root, kind)
+        os.makedirs(folder, exist_ok=True)
+        name = hashlib.sha1(f"{os.path.abspath(source)}\0{digest}".encode()).hexdigest()[:20]
+        return os.path.join(folder, f"{name}.parquet")
+
+    def add_zonal(self, stats, source, digest):
+        path = self._part("zonal", source, digest)
+        stats.to_parquet(path, index=False)
+        return path
+
+    def add_trend(self, product, series, source, digest):
+        path = self._part("trend", source, digest)
+        series.to_parquet(path, index=False)
+        index = _read_json(self.trend_index(product), {"parts": []})
+        if path not in index["parts"]:
+            index["parts"].append(path)
+            _write_json(self.trend_index(product), index)
+        return path
+
+    def remove(self, record):
+        """Drop the part a manifest record points to (and its trend index entry)."""
+        part = record.get("part")
+        if not part or record.get("status") != "ok":
+            return
+        if record["kind"] == "trend":
+            index = _read_json(self.trend_index(record["key"]), {"parts": []})
+            if part in index["parts"]:
+                index["parts"].remove(part)
+                _write_json(self.trend_index(record["key"]), index)
+        if os.path.exists(part):
+            os.remove(part)
+
+    def zonal(self, raster_path, regions_digest):
+        """Stored zonal means for this raster as it is now on disk, or None."""
+        record = self.manifest().get(os.path.abspath(raster_path))
+        if (not record or record["status"] != "ok" or record["kind"] != "raster"
+                or record["regions"] != regions_digest or not os.path.exists(record["part"])):
+            return None
+        try:
+            if record["signature"] != _signature(raster_path):
+                return None
+        except OSError:
+            return None
+        return pd.read_parquet(record["part"])
+
+    def zonal_history(self, pollutant):
+        """Long table of every ingested raster's municipality means for ``pollutant``."""
+        parts = [r["part"] for r in self.manifest().values()
+                 if r["status"] == "ok" and r["kind"] == "raster" and r["key"] == pollutant and os.path.exists(r["part"])]
+        columns = ["date", "source", "name", "municipality", "mean"]
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        return pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)[columns]
+
+
+def read_trend_store(index_path, product):
+    """Trend series merged from every ingested export (bundled series included).
+
+    On overlapping dates the export reaching furthest wins, whatever order
+    the files were ingested in.
+    """
+    value = TREND_PRODUCTS[product]
+    parts = [p for p in _read_json(index_path, {"parts": []})["parts"] if os.path.exists(p)]
+    if not parts:
+        return pd.DataFrame({"Date": pd.Series(dtype="datetime64[ns, UTC]"), value: pd.Series(dtype="float32")})
+    frames = sorted((pd.read_parquet(p, columns=["Date", value]) for p in parts), key=lambda df: df["Date"].max())
+    df = pd.concat(frames, ignore_index=True)
+    return df.drop_duplicates("Date", keep="last").sort_values("Date").reset_index(drop=True)
+
+
+# ── Validation and per-file ingestion ──────────────────────────────────────
+def validate_raster(path, regions):
+    with rasterio.open(path) as src:
+        if src.count < 1 or not np.issubdtype(np.dtype(src.dtypes[0]), np.number):
+            raise ValidationError("no numeric band")
+        if src.crs is None:
+            raise ValidationError("no CRS")
+        pollutant = species(src.descriptions[0] or "", os.path.basename(path))
+        if pollutant is None:
+            raise ValidationError("cannot tell the pollutant from the band description or file name")
+        minx, miny, maxx, maxy = regions.to_crs(src.crs).total_bounds
+        b = src.bounds
+        if b.right <= minx or b.left >= maxx or b.top <= miny or b.bottom >= maxy:
+            raise ValidationError("does not overlap the municipalities")
+    return pollutant
+
+
+def validate_trend(path):
+    match = PRODUCT_RE.match(os.path.basename(path))
+    if not match or match.group(1) not in TREND_PRODUCTS:
+        raise ValidationError(f"cannot tell the product from the file name; expected one of {sorted(TREND_PRODUCTS)}")
+    product = match.group(1)
+    try:
+        df = pd.read_csv(path, usecols=["C0/date", "C0/mean"], dtype={"C0/mean": "float32"})
+    except ValueError as e:
+        raise ValidationError(f"not a Sentinel-5P statistics export: {e}")
+    df["C0/date"] = pd.to_datetime(df["C0/date"], errors="coerce", utc=True)
+    df = df.dropna()
+    if df.empty:
+        raise ValidationError("no rows with a valid date and mean")
+    return product, df.rename(columns={"C0/date": "Date", "C0/mean": TREND_PRODUCTS[product]})
+
+
+class Ingestor:
+    def __init__(self, data_dir=DATA_DIR, csv_dir=DATA_PATH, store=None, settle=SETTLE_SECONDS,
+                 bundled_dir=DATA_PATH):
+        self.data_dir = data_dir
+        self.csv_dir = csv_dir or "."
+        # The bundled series seed the store, so the first new export of a
+        # product extends them instead of replacing them.
+        self.bundled = [os.path.join(bundled_dir or ".", name) for name in BUNDLED_TRENDS]
+        self.store = store or Store()
+        self.settle = settle
+        self._regions = None
+
+    def regions(self):
+        digest = file_digest(GEOJSON)
+        if self._regions is None or self._regions[0] != digest:
+            self._regions = (digest, read_regions(GEOJSON))
+        return self._regions
+
+    def candidates(self):
+        seen = set()
+        for path in self.bundled:
+            if os.path.isfile(path):
+                seen.add(os.path.abspath(path))
+                yield os.path.abspath(path)
+        for folder, match in ((self.data_dir, lambda n: n.lower().endswith(RASTER_EXTENSIONS)),
+                              (self.csv_dir, lambda n: fnmatch.fnmatch(n, CSV_PATTERN))):
+            with os.scandir(folder) as it:
+                for item in it:
+                    if item.is_file() and match(item.name) and os.path.abspath(item.path) not in seen:
+                        yield os.path.abspath(item.path)
+
+    def ingest_raster(self, path, digest):
+        regions_digest, regions = self.regions()
+        pollutant = validate_raster(path, regions)
+        stats = zonal_means(regions, read_raster(path))
+        stats["municipality"] = stats["municipality"].astype(str)
+        stats.insert(0, "date", file_date(os.path.basename(path)))
+        stats.insert(0, "source", os.path.basename(path))
+        return {"kind": "raster", "key": pollutant, "regions": regions_digest, "rows": len(stats),
+                "part": self.store.add_zonal(stats, path, digest)}
+
+    def ingest_trend(self, path, digest):
+        product, series = validate_trend(path)
+        series["source"] = os.path.basename(path)
+        return {"kind": "trend", "key": product, "rows": len(series),
+                "part": self.store.add_trend(product, series, path, digest)}
+
+    def run_once(self):
+        """Ingest new or changed files; returns the manifest records written in this pass."""
+        manifest = self.store.manifest()
+        regions_digest = self.regions()[0]
+        now = time.time()
+        done = {}
+        for path in self.candidates():
+            try:
+                signature = _signature(path)
+            except OSError:
+                continue
+            record = manifest.get(path)
+            stale = record and record.get("kind") == "raster" and record.get("regions") not in (None, regions_digest)
+            if record and record["signature"] == signature and not stale:
+                continue
+            if now - signature[0] / 1e9 < self.settle:
+                continue
+            digest = file_digest(path)
+            is_raster = path.lower().endswith(RASTER_EXTENSIONS)
+            try:
+                result = self.ingest_raster(path, digest) if is_raster else self.ingest_trend(path, digest)
+                result.update(status="ok", reason=None)
+            except (ValidationError, rasterio.errors.RasterioError, OSError) as e:
+                result = {"kind": "raster" if is_raster else "trend", "key": None, "status": "rejected", "reason": str(e)}
+            if record and record.get("part") != result.get("part"):
+                self.store.remove(record)
+            result.update(signature=signature, digest=digest, ingested=now)
+            manifest[path] = done[path] = result
+
+        for path in [p for p in manifest if not os.path.exists(p)]:
+            record = manifest.pop(path)
+            self.store.remove(record)
+            done[path] = {**record, "status": "removed"}
+
+        if done:
+            os.makedirs(self.store.root, exist_ok=True)
+            _write_json(self.store.manifest_path, manifest)
+            self.store.bump()
+        return done
+
+    def watch(self, interval=POLL_INTERVAL, stop=None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for path, record in self.run_once().items():
+                detail = record.get("reason") or f"{record.get('key')} · {record.get('rows', 0)} rows"
+                print(f"[{time.strftime('%H:%M:%S')}] {record['status']:8} {os.path.basename(path)} ({detail})", flush=True)
+            stop.wait(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest new rasters and Sentinel-5P exports for the Turin dashboard.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--csv-dir", default=DATA_PATH or ".")
+    parser.add_argument("--bundled-dir", default=DATA_PATH or ".", help="where the bundled trend CSVs live")
+    parser.add_argument("--store", default=STORE_DIR)
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS)
+    parser.add_argument("--once", action="store_true", help="ingest what is there now and exit")
+    args = parser.parse_args()
+    ingestor = Ingestor(args.data_dir, args.csv_dir, Store(args.store), args.settle, args.bundled_dir)
+    if args.once:
+        for path, record in ingestor.run_once().items():
+            print(f"{record['status']:8} {os.path.basename(path)} {record.get('reason') or ''}")
+    else:
+        print(f"Watching {args.data_dir} and {args.csv_dir} every {args.interval}s (store: {args.store})")
+        try:
+            ingestor.watch(args.interval)
+        except KeyboardInterrupt:
+            pass
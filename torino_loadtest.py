@@ -0,0 +1,254 @@
+"""Concurrent-session load test for the dashboard.
+
+Drives N simulated sessions through every page and pollutant with
+Streamlit's AppTest, all inside this process, and writes a JSON report:
+
+    python torino_loadtest.py --sessions 8 --rounds 2 --out report.json
+    python torino_loadtest.py --sessions 8 --compare baseline.json
+
+The report holds latency percentiles per page, the throughput of the whole
+run, process RSS before/after, the RSS growth per live session, and what
+each session holds by type: GeoDataFrames, other DataFrames, numpy arrays
+(count and MB) and matplotlib Figures (count). ``--trace-memory`` adds
+tracemalloc's traced bytes per session and the allocation sites holding the
+most memory; it slows every rerun, so only compare its latencies with other
+traced runs. With ``--compare``, the new report is checked against an older
+one, and any metric that got worse by more than ``--tolerance`` is listed as
+a regression (the exit status is then 1).
+"""
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "torino_app.py")
+PAGES_DIR = "views"
+POLLUTANT_LABEL = "Select pollutant:"
+# Checked in order; the first match wins, so GeoDataFrame precedes DataFrame.
+CENSUS_TYPES = {"GeoDataFrame": gpd.GeoDataFrame, "DataFrame": pd.DataFrame, "Figure": Figure, "ndarray": np.ndarray}
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def pages(app):
+    """Page scripts, relative to the app as AppTest.switch_page expects."""
+    root = os.path.dirname(app)
+    return sorted(os.path.relpath(path, root) for path in glob.glob(os.path.join(root, PAGES_DIR, "*.py")))
+
+
+def run_session(app, rounds, timeout, timings, lock, sessions):
+    at = AppTest.from_file(app, default_timeout=timeout)
+    start = time.perf_counter()
+    at.run()
+    record = [("startup", time.perf_counter() - start, bool(at.exception))]
+
+    pollutants = _widget(at.sidebar.selectbox, POLLUTANT_LABEL).options
+    for _ in range(rounds):
+        for page in pages(app):
+            at.switch_page(page)
+            for pollutant in pollutants:
+                _widget(at.sidebar.selectbox, POLLUTANT_LABEL).set_value(pollutant)
+                start = time.perf_counter()
+                at.run()
+                record.append((page, time.perf_counter() - start, bool(at.exception)))
+
+    with lock:
+        timings.extend(record)
+        # Keep the AppTest alive so its session state counts towards memory.
+        sessions.append(at)
+
+
+def summarize(timings):
+    report = {}
+    for section in dict.fromkeys(name for name, _, _ in timings):
+        values = np.array([t for name, t, _ in timings if name == section])
+        errors = sum(err for name, _, err in timings if name == section)
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        report[section] = {
+            "runs": int(values.size),
+            "errors": int(errors),
+            "p50_ms": round(p50 * 1000, 1),
+            "p90_ms": round(p90 * 1000, 1),
+            "p99_ms": round(p99 * 1000, 1),
+            "max_ms": round(values.max() * 1000, 1),
+        }
+    return report
+
+
+def object_census():
+    """Live count and bytes of GeoDataFrames, other DataFrames, numpy arrays and matplotlib Figures.
+
+    Arrays are not tracked by the garbage collector, so they are found through
+    the objects that reference them and counted once per owning buffer; frame
+    bytes are the frames' own (shallow) usage and overlap with the arrays.
+    """
+    gc.collect()
+    census = {name: {"count": 0, "bytes": 0} for name in CENSUS_TYPES}
+    arrays = {}
+    for obj in gc.get_objects():
+        for name, kind in CENSUS_TYPES.items():
+            if isinstance(obj, kind):
+                census[name]["count"] += 1
+                if isinstance(obj, pd.DataFrame):
+                    census[name]["bytes"] += int(obj.memory_usage(index=True, deep=False).sum())
+                break
+        for ref in gc.get_referents(obj):
+            if isinstance(ref, np.ndarray):
+                while isinstance(ref.base, np.ndarray):
+                    ref = ref.base
+                arrays[id(ref)] = ref.nbytes
+    census["ndarray"] = {"count": len(arrays), "bytes": int(sum(arrays.values()))}
+    return census
+
+
+def top_allocations(snapshot, limit=10):
+    stats = snapshot.statistics("filename")
+    return [{"file": str(s.traceback[0].filename), "mb": round(s.size / 2**20, 2)} for s in stats[:limit]]
+
+
+def load_test(app=APP, sessions=4, rounds=1, timeout=300, trace_memory=False):
+    # Warm one session first so imports and on-disk caches are not billed to the load.
+    AppTest.from_file(app, default_timeout=timeout).run()
+
+    if trace_memory:
+        tracemalloc.start()
+    rss_before = rss_bytes()
+    traced_before = tracemalloc.get_traced_memory()[0]
+    census_before = object_census()
+
+    timings, live, lock = [], [], threading.Lock()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [pool.submit(run_session, app, rounds, timeout, timings, lock, live) for _ in range(sessions)]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - start
+
+    rss_after = rss_bytes()
+    memory = {
+        "rss_before_mb": round(rss_before / 2**20, 1),
+        "rss_after_mb": round(rss_after / 2**20, 1),
+        "rss_per_session_mb": round((rss_after - rss_before) / sessions / 2**20, 2),
+        # Objects held per live session (net of the engine's shared ones, built by the warm-up).
+        "objects_per_session": {
+            name: {"count": round((after["count"] - census_before[name]["count"]) / sessions, 1),
+                   "mb": round((after["bytes"] - census_before[name]["bytes"]) / sessions / 2**20, 2)}
+            for name, after in object_census().items()
+        },
+    }
+    if trace_memory:
+        traced_after, traced_peak = tracemalloc.get_traced_memory()
+        memory["traced_per_session_mb"] = round((traced_after - traced_before) / sessions / 2**20, 2)
+        memory["traced_peak_mb"] = round(traced_peak / 2**20, 1)
+        memory["top_allocations"] = top_allocations(tracemalloc.take_snapshot())
+        tracemalloc.stop()
+
+    return {
+        "meta": {
+            "app": os.path.basename(app),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "sessions": sessions,
+            "rounds": rounds,
+            "wall_s": round(wall, 2),
+            "throughput_rps": round(len(timings) / wall, 2),
+            "trace_memory": trace_memory,
+        },
+        "sections": summarize(timings),
+        "memory": memory,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(new, old, tolerance=0.2):
+    """List metrics in ``new`` that are worse than ``old`` by more than ``tolerance``."""
+    regressions = []
+    for section, stats in new["sections"].items():
+        before = old.get("sections", {}).get(section)
+        if not before:
+            continue
+        for key in ("p50_ms", "p90_ms", "p99_ms"):
+            if before[key] and stats[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{section} {key}: {before[key]} -> {stats[key]}")
+        if stats["errors"] > before["errors"]:
+            regressions.append(f"{section} errors: {before['errors']} -> {stats['errors']}")
+    a, b = old.get("meta", {}).get("throughput_rps"), new["meta"]["throughput_rps"]
+    if a and b < a * (1 - tolerance):
+        regressions.append(f"overall throughput_rps: {a} -> {b}")
+    for name, stats in new["memory"].get("objects_per_session", {}).items():
+        before = old.get("memory", {}).get("objects_per_session", {}).get(name)
+        if before and before["mb"] > 0 and stats["mb"] > before["mb"] * (1 + tolerance):
+            regressions.append(f"memory {name} per session: {before['mb']} -> {stats['mb']} MB")
+    for key in ("rss_per_session_mb", "traced_per_session_mb"):
+        a, b = old.get("memory", {}).get(key), new["memory"].get(key)
+        if a and b is not None and b > a * (1 + tolerance):
+            regressions.append(f"memory {key}: {a} -> {b}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the Turin dashboard.")
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--trace-memory", action="store_true", help="also account memory with tracemalloc (slower)")
+    args = parser.parse_args(argv)
+
+    report = load_test(os.path.abspath(args.app), args.sessions, args.rounds, args.timeout, args.trace_memory)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
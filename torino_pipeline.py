@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from pyproj import CRS
+from rasterstats import zonal_stats
+
+# Derivations shared by the dashboard and the query API: raster → zonal means →
+# socio-economic merge → SDG 11 score, plus the Sentinel-5P trend series.
+
+TREND_PRODUCTS = {"CO": "CO_Level", "AER_AI": "Aerosol_Index"}
+
+
+def normalize(arr, vmin=None, vmax=None):
+    # Pass catalog stats as vmin/vmax to skip the full-array scan.
+    if vmin is None or vmax is None:
+        vmin, vmax = np.nanmin(arr), np.nanmax(arr)
+    norm = np.nan_to_num((arr - vmin) / (vmax - vmin))
+    return norm, vmin, vmax
+
+
+def zonal_means(regions, raster):
+    """Mean pixel value per municipality, keyed like ``regions`` (no geometry copy)."""
+    if raster.crs is not None and regions.crs is not None and not regions.crs.equals(CRS.from_user_input(raster.crs)):
+        # rasterstats works in the raster's pixel space; the polygons must share its CRS.
+        regions = regions.to_crs(raster.crs)
+    stats = zonal_stats(regions, raster.arr, affine=raster.transform, stats=["mean"], nodata=raster.nodata)
+    return pd.DataFrame({
+        "name": regions["name"].values,
+        "municipality": regions["municipality"].values,
+        "mean": np.array([s["mean"] for s in stats], dtype="float32")
+    })
+
+
+def merge_socio(regions_stats, pollutant, vehicle, socio, population):
+    # All key columns share the regions' categorical dtype, so these joins run on int codes.
+    pop = population.groupby("Municipality", as_index=False, observed=True)["Total"].sum()
+    merged = pd.DataFrame({
+        "Municipality": regions_stats["municipality"],
+        f"{pollutant}_Level": regions_stats["mean"]
+    })
+    merged = merged.merge(vehicle, left_on="Municipality", right_on="municipality", how="left")
+    merged = merged.merge(socio, left_on="Municipality", right_on="municipality", how="left")
+    merged = merged.merge(pop, on="Municipality", how="left")
+    merged["Municipality"] = merged["Municipality"].astype(str)
+    return merged
+
+
+def sdg_scores(merged, pollutant, vmax):
+    """SDG 11 score per row: mean of pollution, vehicle and housing sub-scores, scaled to 0-100."""
+    pollution_score = 1 - np.minimum(merged[f"{pollutant}_Level"] / vmax, 1)
+    vehicle_score = 1 - np.minimum(merged["vehicle_per_1000"] / 1000, 1)
+    housing_score = (merged["housing_quality_index"] / 100).fillna(0)
+    return ((pollution_score + vehicle_score + housing_score) / 3 * 100).round(2)
+
+
+def _resample_rule(rule):
+    # pandas >= 2.2 spells month/quarter/year ends "ME"/"QE"/"YE".
+    aliases = {"M": "ME", "Q": "QE", "Y": "YE", "A": "YE"}
+    try:
+        pd.tseries.frequencies.to_offset(aliases.get(rule, rule))
+        return aliases.get(rule, rule)
+    except ValueError:
+        return rule
+
+
+def trend_series(df, value_col, start=None, end=None, resample=None):
+    series = df.set_index("Date")[value_col].sort_index()
+    if series.index.tz is not None:
+        series.index = series.index.tz_localize(None)
+    if start is not None:
+        series = series[series.index >= pd.Timestamp(start)]
+    if end is not None:
+        series = series[series.index <= pd.Timestamp(end)]
+    if resample:
+        series = series.resample(_resample_rule(resample)).mean()
+    return series.rename(value_col).reset_index()
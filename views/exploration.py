@@ -0,0 +1,28 @@
+import matplotlib.pyplot as plt
+import seaborn as sns
+import streamlit as st
+
+from torino_engine import get_engine
+
+engine = get_engine()
+pollutant = st.session_state["pollutant"]
+norm, vmin, vmax = engine.normalized(pollutant)
+
+st.markdown("## 📊 Data Exploration")
+st.markdown("#### 🔢 Pixel Grid Heatmap (Preview)")
+fig1, ax1 = plt.subplots(figsize=(6, 5))
+sns.heatmap(norm[::10, ::10], cmap="plasma", cbar=True, ax=ax1)
+st.pyplot(fig1)
+
+st.markdown("#### 📈 Pollution Value Distribution")
+fig2, ax2 = plt.subplots(figsize=(6, 3))
+vals = norm.flatten()
+vals = vals[vals > 0]
+ax2.hist(vals, bins=30, color="orange", edgecolor="black")
+ax2.set_xlabel("Normalized Value")
+ax2.set_ylabel("Pixel Count")
+st.pyplot(fig2)
+
+st.markdown("#### 🏩 Municipality Pollution Ranking")
+df_table = engine.zonal(pollutant)[["name", "mean"]].sort_values(by="mean", ascending=False)
+st.dataframe(df_table.rename(columns={"name": "Municipality", "mean": f"{pollutant} Level"}))
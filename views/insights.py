@@ -0,0 +1,6 @@
+import streamlit as st
+
+st.markdown("## 🏩 Urban SDG 11 Insights")
+st.success("1. High-risk zones from NO2 map should be targeted with traffic and emissions policy.")
+st.info("2. Trends show seasonal variation — plan interventions during high exposure months.")
+st.warning("3. Use zoning laws to restrict industrial emissions in urban cores.")
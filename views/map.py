@@ -0,0 +1,33 @@
+import streamlit as st
+from streamlit_folium import st_folium
+
+from torino_engine import get_engine
+from torino_export import download_buttons
+from torino_map import build_base_map, build_pollutant_layer
+
+engine = get_engine()
+pollutant = st.session_state["pollutant"]
+norm, vmin, vmax = engine.normalized(pollutant)
+
+st.markdown("### 🗼️ Interactive Map")
+# The base map is identical on every run, so st_folium keeps it mounted
+# (position included) and only applies the pollutant feature group. The base
+# map script, boundaries included, is still sent with every rerun.
+m = build_base_map(engine.regions(), engine.center())
+pollutant_layer, colormap = build_pollutant_layer(engine.zonal(pollutant), norm, engine.raster(pollutant).bounds, pollutant)
+st_folium(
+    m,
+    key="pollutant_map",
+    feature_group_to_add=pollutant_layer,
+    returned_objects=[],
+    width=1200,
+    height=600
+)
+st.markdown(colormap._repr_html_(), unsafe_allow_html=True)
+entry = engine.entry(pollutant)
+st.caption(f"{entry.description or pollutant} · {entry.date or 'undated'} · {entry.width}×{entry.height} px, {entry.crs} · "
+           f"range {entry.stats['min']:.4g}–{entry.stats['max']:.4g} ({entry.stats_source} statistics)")
+st.markdown("**🗱️ Darker colors indicate higher risk zones. Prioritize these areas for urban planning actions.**")
+
+st.markdown("#### ⬇️ Download zonal statistics")
+download_buttons(engine, "zonal", pollutant)
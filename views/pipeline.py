@@ -0,0 +1,35 @@
+import pandas as pd
+import streamlit as st
+
+from torino_engine import get_engine
+
+engine = get_engine()
+pollutant = st.session_state["pollutant"]
+graph = engine.graph
+
+st.markdown("## ⚙️ Pipeline")
+st.markdown("Every artifact is a node keyed by the content of its inputs; it is recomputed only when something upstream changes.")
+
+st.markdown("#### 🧮 Nodes")
+st.dataframe(graph.report(), hide_index=True)
+st.caption("runs: computations since the process started · hits: requests served from memory · last_ms: time of the latest computation, excluding its inputs.")
+
+st.markdown("#### 🕒 Recent computations")
+st.dataframe(graph.runs(), hide_index=True)
+
+st.markdown("#### 📥 Startup inputs")
+names = list(dict.fromkeys([*engine.timings, *engine.errors]))
+st.dataframe(pd.DataFrame({
+    "input": names,
+    "load_ms": [round(engine.timings[n] * 1000, 1) if n in engine.timings else None for n in names],
+    "error": [engine.errors.get(n) for n in names],
+}), hide_index=True)
+st.caption("Inputs read concurrently when the engine starts. One that failed is read again on first use; "
+           "one that timed out keeps loading in the background.")
+
+st.markdown("#### 💾 Memory by input")
+st.dataframe(engine.memory_report(pollutant), hide_index=True)
+
+st.markdown("#### 🔗 Dependency graph")
+st.graphviz_chart(graph.to_dot(pollutant=pollutant, product="CO", level="municipality",
+                               dataset="merged", key=pollutant, fmt="csv"))
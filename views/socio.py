@@ -0,0 +1,104 @@
+import folium
+import geopandas as gpd
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+import streamlit as st
+from streamlit_folium import st_folium
+
+from torino_engine import get_engine
+from torino_export import download_buttons
+
+engine = get_engine()
+pollutant = st.session_state["pollutant"]
+
+st.markdown("## 📃 Socio-Economic Analysis")
+try:
+    merged = engine.merged(pollutant).copy()
+
+    st.markdown("### 🌐 Socio-Economic Risk Map")
+    regions = engine.regions()
+    columns = ["Municipality", f"{pollutant}_Level", "vehicle_per_1000", "housing_quality_index", "Total"]
+    risk = gpd.GeoDataFrame(merged[columns], geometry=regions.geometry.values, crs=regions.crs)
+    m = folium.Map(location=engine.center(), zoom_start=11, tiles="CartoDB positron")
+    folium.GeoJson(
+        risk[~risk.geometry.is_empty],
+        tooltip=folium.GeoJsonTooltip(fields=columns,
+                                      aliases=["Municipality", "Pollution", "Vehicles/1000", "Housing Quality", "Population"]),
+        name="Socio-Economic Layer"
+    ).add_to(m)
+    st_folium(m, key="risk_map", returned_objects=[], width=1200, height=500)
+
+    st.markdown("### 🔍 Integrated Insights")
+    st.markdown("- Municipalities with **high vehicle density** often correlate with higher NO₂ levels.")
+    st.markdown("- **Lower housing quality** can be associated with poorer urban planning and higher pollutant exposure.")
+    st.markdown("- **Population concentration** plays a role in urban heat and emission zones.")
+
+    st.markdown("### 📋 Top Municipalities by Pollution and Socio-Economic Indicators")
+    st.dataframe(merged[["Municipality", f"{pollutant}_Level", "vehicle_per_1000", "housing_quality_index", "Total"]]
+                 .sort_values(by=f"{pollutant}_Level", ascending=False).head(10))
+    st.markdown("Download the full municipality table:")
+    download_buttons(engine, "merged", pollutant)
+
+    st.markdown("### 👥 Population-Weighted Exposure")
+    exposure = engine.exposure()
+    st.dataframe(exposure[exposure["Municipality"].isin(merged["Municipality"])].set_index("Municipality"))
+    st.caption("Pixel values weighted by exact polygon coverage, pixel area and each municipality's own population density. "
+               "Density is one value per municipality, so this equals area weighting until a real gridded population layer is supplied.")
+
+    st.markdown("### 📈 Correlation Matrix")
+    method = st.radio("Method:", ["pearson", "spearman"], horizontal=True)
+    corr_table = engine.correlations()
+    corr_view = corr_table[corr_table["method"] == method]
+    corr = corr_view.pivot(index="pollutant", columns="indicator", values="r")
+    fig_corr, ax_corr = plt.subplots(figsize=(10, 6))
+    sns.heatmap(corr, annot=True, cmap="coolwarm", vmin=-1, vmax=1, ax=ax_corr)
+    st.pyplot(fig_corr)
+    st.dataframe(corr_view.drop(columns="method").sort_values("p_value").reset_index(drop=True))
+    st.caption(f"95% bootstrap confidence intervals and permutation p-values over {corr_view['n'].max()} municipalities with complete data.")
+
+    st.markdown("### 🚗 Mobility to Pollution Ratio")
+    merged["Mobility_to_Pollution"] = merged["vehicle_per_1000"] / (merged[f"{pollutant}_Level"] + 1e-5)
+    fig_ratio, ax_ratio = plt.subplots(figsize=(8, 4))
+    top_ratio = merged.sort_values("Mobility_to_Pollution", ascending=False).head(10)
+    sns.barplot(x="Mobility_to_Pollution", y="Municipality", data=top_ratio, palette="viridis", ax=ax_ratio)
+    ax_ratio.set_title("Top 10 Municipalities: Vehicle Density vs Pollution")
+    ax_ratio.set_xlabel("Vehicles per 1000 / Pollution Level")
+    st.pyplot(fig_ratio)
+
+    st.markdown("### 🚨 Pollution Hotspots")
+    spots = engine.hotspots(pollutant)
+    hot = spots[spots["hotspot"] == "Hot spot"].sort_values("gi_z", ascending=False)
+    hot = hot.merge(merged[["Municipality", "vehicle_per_1000", "housing_quality_index", "Total"]], on="Municipality", how="left")
+    st.dataframe(hot[["Municipality", "value", "gi_z", "p_value", "cluster", "vehicle_per_1000", "housing_quality_index", "Total"]]
+                 .rename(columns={"value": "Pollution Level", "gi_z": "Gi* z", "p_value": "p-value", "cluster": "Moran cluster"})
+                 .head(15))
+    counts = spots["cluster"].value_counts()
+    st.caption(f"Getis-Ord Gi* hot spots (p < 0.05, 999 conditional permutations, queen contiguity) among the "
+               f"{spots['value'].notna().sum()} municipalities with data coverage: {len(hot)}. "
+               f"Local Moran clusters: {counts.get('HH', 0)} high-high, {counts.get('LL', 0)} low-low, "
+               f"{counts.get('HL', 0) + counts.get('LH', 0)} spatial outliers.")
+
+    pixels = engine.hotspots(pollutant, level="pixel")
+    grid = np.full(engine.raster(pollutant).arr.shape, np.nan)
+    significant = pixels["hotspot"] != "Not significant"
+    grid[pixels["row"][significant], pixels["col"][significant]] = pixels["gi_z"][significant]
+    fig_hot, ax_hot = plt.subplots(figsize=(8, 4))
+    limit = np.nanmax(np.abs(grid)) if significant.any() else 1
+    image = ax_hot.imshow(grid, cmap="coolwarm", vmin=-limit, vmax=limit)
+    fig_hot.colorbar(image, ax=ax_hot, label="Gi* z (significant pixels)")
+    ax_hot.set_title("Pixel-level hot (red) and cold (blue) spots")
+    ax_hot.axis("off")
+    st.pyplot(fig_hot)
+
+    st.markdown("### 🧮 SDG 11 Compliance Score")
+    fig_score, ax_score = plt.subplots(figsize=(10, 5))
+    top_score = merged.sort_values("SDG_11_Score", ascending=False).head(10)
+    sns.barplot(x="SDG_11_Score", y="Municipality", data=top_score, palette="Greens", ax=ax_score)
+    ax_score.set_title("Top 10 Municipalities by SDG 11 Compliance Score")
+    st.pyplot(fig_score)
+
+    st.markdown("**ℹ️ SDG 11 Score is computed using pollution, vehicle density, and housing quality. A higher score indicates better alignment with sustainable urban goals.**")
+
+except Exception as e:
+    st.error(f"Error loading socio-economic data: {e}")
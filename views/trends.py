@@ -0,0 +1,33 @@
+import matplotlib.pyplot as plt
+import streamlit as st
+
+from torino_engine import get_engine
+from torino_export import download_buttons
+
+engine = get_engine()
+
+st.markdown("## 📈 Urban Pollution Trends (CO & Aerosol Index)")
+try:
+    co_df = engine.trend("CO")
+    aer_df = engine.trend("AER_AI")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### 🟠 Carbon Monoxide (CO)")
+        fig_co, ax_co = plt.subplots(figsize=(6, 3))
+        ax_co.plot(co_df["Date"], co_df["CO_Level"], color="orange")
+        ax_co.set_ylabel("CO Level")
+        ax_co.set_xlabel("Date")
+        st.pyplot(fig_co)
+        download_buttons(engine, "trend", "CO", ["csv", "parquet"])
+    with col2:
+        st.markdown("#### 🔵 Aerosol Index")
+        fig_ai, ax_ai = plt.subplots(figsize=(6, 3))
+        ax_ai.plot(aer_df["Date"], aer_df["Aerosol_Index"], color="blue")
+        ax_ai.set_ylabel("Aerosol Index")
+        ax_ai.set_xlabel("Date")
+        st.pyplot(fig_ai)
+        download_buttons(engine, "trend", "AER_AI", ["csv", "parquet"])
+
+except Exception as e:
+    st.warning(f"Could not load trends data: {e}")